@@ -0,0 +1,84 @@
+"""
+Times mime.summarize() against the equivalent code that walks the message,
+reads all the headers and decodes every body, see the "Summaries" section of
+docs/Benchmarks.md.
+
+    $ python benchmarks/summary.py tests/fixtures/messages/big.eml
+
+Without arguments the messages from tests/fixtures/messages are used.
+"""
+import os
+import sys
+import timeit
+from email.utils import mktime_tz, parsedate_tz
+
+from flanker import mime
+from flanker.addresslib import address
+
+MESSAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        os.pardir, 'tests', 'fixtures', 'messages')
+DEFAULT_FILES = ('big.eml', 'torture.eml', 'enclosed.eml')
+HEADER_FIELDS = ('message_id', 'from', 'subject', 'date')
+REPEAT = 7
+
+
+def walk_summary(string):
+    message = mime.from_string(string)
+    headers = dict(message.headers.items())
+    date = headers.get('Date')
+    summary = {
+        'message_id': message.message_id,
+        'from': list(address.parse_list(headers.get('From', ''))),
+        'to': list(address.parse_list(headers.get('To', ''))),
+        'cc': list(address.parse_list(headers.get('Cc', ''))),
+        'subject': message.subject,
+        'date': date and mktime_tz(parsedate_tz(date)),
+        'text': None,
+        'html': None,
+        'attachments': []}
+    for part in message.walk(with_self=True):
+        if part.content_type.is_multipart():
+            continue
+        body = part.body
+        if part.is_attachment() or part.detected_file_name:
+            if part.content_type.is_message_container():
+                size = part.enclosed.size
+            else:
+                size = len(body)
+            summary['attachments'].append((part.detected_file_name, size))
+        elif part.content_type == 'text/plain' and summary['text'] is None:
+            summary['text'] = body
+        elif part.content_type == 'text/html' and summary['html'] is None:
+            summary['html'] = body
+    return summary
+
+
+def best_time(fn, number):
+    """Returns the best time of a call in milliseconds."""
+    return min(timeit.repeat(fn, number=number, repeat=REPEAT)) / number * 1000
+
+
+def main(paths):
+    print('| File Size | walk (ms) | `summarize`, all fields (ms) '
+          '| `summarize`, header fields (ms) | `summarize`, text (ms) |')
+    for path in paths:
+        with open(path, 'rb') as f:
+            string = f.read()
+        number = 5 if len(string) > 100000 else 500
+        print('| %-9s | %9.1f | %28.1f | %31.1f | %22.1f |' % (
+            _size(len(string)),
+            best_time(lambda: walk_summary(string), number),
+            best_time(lambda: mime.summarize(string), number),
+            best_time(lambda: mime.summarize(string, HEADER_FIELDS), number),
+            best_time(lambda: mime.summarize(string, ('text',)), number)))
+
+
+def _size(size):
+    if size >= 1024 * 1024:
+        return '%.1f MB' % (size / 1024.0 / 1024)
+    return '%d KB' % (size // 1024)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or [os.path.join(MESSAGES, name)
+                          for name in DEFAULT_FILES])
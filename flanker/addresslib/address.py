@@ -51,7 +51,7 @@ from flanker.addresslib._parser.parser import (Mailbox, Url, mailbox_parser,
                                                addr_spec_parser, url_parser)
 from flanker.addresslib.quote import smart_unquote, smart_quote
 from flanker.addresslib.validate import (mail_exchanger_lookup,
-                                         plugin_for_esp)
+                                         plugin_for_domain, plugin_for_esp)
 from flanker.mime.message.headers.encodedword import mime_to_unicode
 from flanker.mime.message.headers.encoding import encode_string
 from flanker.utils import is_pure_ascii, metrics_wrapper
@@ -594,6 +594,24 @@ class EmailAddress(Address):
         """
         return self.hostname.startswith('[') and self.hostname.endswith(']')
 
+    def canonical_key(self, plugin=None):
+        """
+        Returns a key that is the same for all addresses delivered to the same
+        mailbox, according to the rules of the ESP hosting it: e.g. dots and
+        tags are ignored by gmail, yahoo AddressGuard addresses belong to the
+        base mailbox. If the ESP is not known the lower cased address is
+        returned. Pass the plugin returned by validate.plugin_for_esp() to
+        apply ESP rules to custom domains.
+
+            >>> parse('Bob.Silva+news@googlemail.com').canonical_key()
+            u'bobsilva@gmail.com'
+        """
+        plugin = plugin or plugin_for_domain(self._hostname)
+        if plugin:
+            return plugin.canonicalize(self)
+
+        return self.address.lower()
+
     def __cmp__(self, other):
         return True
 
@@ -0,0 +1,174 @@
+# coding:utf-8
+
+"""
+Bulk deduplication of email address lists by canonical key, see
+EmailAddress.canonical_key() for the rules applied to ESP addresses.
+
+Public Functions and Classes in flanker.addresslib.dedupe module:
+
+    * DedupeIndex(buckets=64, max_buffered=100000, tmpdir=None)
+
+      Collects addresses in a single pass and groups them by canonical key.
+      Memory usage is bounded: buffered entries are spilled to temporary
+      bucket files, and groups are built one bucket at a time.
+
+    * group_by_canonical_key(addresses, **kwargs)
+
+      Convenience wrapper, returns an iterator of (key, [addresses]) pairs.
+
+    * unique(addresses, **kwargs)
+
+      Returns an iterator over the first address seen for every canonical key.
+
+Examples:
+    >>> list(group_by_canonical_key(['b.ob@gmail.com', 'bob+x@gmail.com']))
+    [(u'bob@gmail.com', [u'b.ob@gmail.com', u'bob+x@gmail.com'])]
+"""
+import json
+import tempfile
+from collections import deque
+
+import six
+
+from flanker.addresslib.address import EmailAddress, parse
+
+
+class DedupeIndex(object):
+    """
+    Groups addresses by canonical key. Addresses that can not be parsed are
+    ignored, add() returns None for them.
+
+        >>> index = DedupeIndex()
+        >>> index.add('Bob.Silva@gmail.com')
+        u'bobsilva@gmail.com'
+        >>> for key, addresses in index.groups():
+        ...     pass
+    """
+
+    def __init__(self, buckets=64, max_buffered=100000, tmpdir=None):
+        self._num_buckets = buckets
+        self._max_buffered = max_buffered
+        self._tmpdir = tmpdir
+        self._buffers = [deque() for _ in range(buckets)]
+        self._files = [None] * buckets
+        self._buffered = 0
+        self.count = 0
+
+    def add(self, address):
+        """
+        Adds an address (a string or an EmailAddress) to the index and
+        returns its canonical key.
+        """
+        key = canonical_key(address)
+        if key is None:
+            return None
+
+        if isinstance(address, EmailAddress):
+            address = address.to_unicode()
+        elif isinstance(address, six.binary_type):
+            address = address.decode('utf-8')
+
+        self._buffers[hash(key) % self._num_buckets].append((key, address))
+        self._buffered += 1
+        self.count += 1
+        if self._buffered >= self._max_buffered:
+            self._spill()
+
+        return key
+
+    def update(self, addresses):
+        for address in addresses:
+            self.add(address)
+
+    def groups(self):
+        """
+        Returns an iterator of (key, [addresses]) pairs. Addresses of a group
+        are listed in the order they were added. Only one bucket is loaded
+        into memory at a time.
+        """
+        for i in range(self._num_buckets):
+            grouped = {}
+            order = deque()
+            for key, address in self._read_bucket(i):
+                group = grouped.get(key)
+                if group is None:
+                    group = grouped[key] = []
+                    order.append(key)
+                group.append(address)
+
+            for key in order:
+                yield key, grouped.pop(key)
+
+    def close(self):
+        for f in self._files:
+            if f:
+                f.close()
+        self._files = [None] * self._num_buckets
+        self._buffers = [deque() for _ in range(self._num_buckets)]
+        self._buffered = 0
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _spill(self):
+        for i, buf in enumerate(self._buffers):
+            if not buf:
+                continue
+            f = self._files[i]
+            if f is None:
+                f = self._files[i] = tempfile.TemporaryFile(
+                    mode='w+b', dir=self._tmpdir)
+            for entry in buf:
+                f.write(json.dumps(entry).encode('utf-8') + b'\n')
+            buf.clear()
+        self._buffered = 0
+
+    def _read_bucket(self, i):
+        f = self._files[i]
+        if f is not None:
+            f.flush()
+            f.seek(0)
+            for line in f:
+                yield tuple(json.loads(line.decode('utf-8')))
+            f.seek(0, 2)
+
+        for entry in self._buffers[i]:
+            yield entry
+
+
+def canonical_key(address):
+    """
+    Returns the canonical key of an address given as a string or an
+    EmailAddress, or None if it is not an email address.
+    """
+    if not isinstance(address, EmailAddress):
+        address = parse(address)
+        if not isinstance(address, EmailAddress):
+            return None
+
+    return address.canonical_key()
+
+
+def group_by_canonical_key(addresses, **kwargs):
+    """
+    Groups addresses by canonical key in a single pass over the input,
+    see DedupeIndex for the arguments.
+    """
+    with DedupeIndex(**kwargs) as index:
+        index.update(addresses)
+        for group in index.groups():
+            yield group
+
+
+def unique(addresses, **kwargs):
+    """
+    Returns the first address seen for every canonical key.
+    """
+    for _, group in group_by_canonical_key(addresses, **kwargs):
+        yield group[0]
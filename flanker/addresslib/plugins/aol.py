@@ -42,6 +42,7 @@ UNDERSCORE = re.compile(r'''
                         ''', re.MULTILINE | re.VERBOSE)
 
 AOL_UNMANAGED = ['verizon.net']
+AOL_DOMAINS = ['aol.com', 'aim.com']
 
 
 def validate(email_addr):
@@ -102,3 +103,10 @@ def _validate(localpart):
 
 def unmanaged_email(hostname):
     return hostname in AOL_UNMANAGED
+
+
+def canonicalize(email_addr):
+    """
+    Returns the canonical form of an aol address, case is ignored.
+    """
+    return email_addr.address.lower()
@@ -47,6 +47,9 @@ DOT        = re.compile(r'''
                         [\.]
                         ''', re.MULTILINE | re.VERBOSE)
 
+GMAIL_DOMAINS = ['gmail.com', 'googlemail.com']
+GMAIL_CANONICAL_DOMAIN = 'gmail.com'
+
 
 def validate(email_addr):
     # Setup for handling EmailAddress type instead of literal string
@@ -109,3 +112,13 @@ def _tags(stream):
             break
 
     return True
+
+
+def canonicalize(email_addr):
+    """
+    Returns the canonical form of a gmail address: dots and tags are
+    ignored by gmail, so they are stripped, and googlemail.com is the
+    same mailbox as gmail.com.
+    """
+    localpart = email_addr.mailbox.split('+')[0].replace('.', '').lower()
+    return u'{}@{}'.format(localpart, GMAIL_CANONICAL_DOMAIN)
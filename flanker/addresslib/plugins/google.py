@@ -129,3 +129,12 @@ def _tags(stream):
             break
 
     return True
+
+
+def canonicalize(email_addr):
+    """
+    Returns the canonical form of a Google Apps address: everything after
+    the plus (+) is ignored. Unlike gmail.com dots are significant.
+    """
+    localpart = email_addr.mailbox.split('+')[0].lower()
+    return u'{}@{}'.format(localpart, email_addr.hostname)
@@ -52,6 +52,8 @@ PERIODS         = re.compile(r'''
                             \.{2,}
                             ''', re.MULTILINE | re.VERBOSE)
 
+HOTMAIL_DOMAINS = ['hotmail.com', 'outlook.com', 'live.com', 'msn.com']
+
 
 def validate(email_addr):
     # Setup for handling EmailAddress type instead of literal string
@@ -116,3 +118,12 @@ def _tags(stream):
         return False
 
     return True
+
+
+def canonicalize(email_addr):
+    """
+    Returns the canonical form of a hotmail address: the tag after the
+    plus (+) is ignored.
+    """
+    localpart = email_addr.mailbox.split('+')[0].lower()
+    return u'{}@{}'.format(localpart, email_addr.hostname)
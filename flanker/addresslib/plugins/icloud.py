@@ -60,6 +60,9 @@ UNDERSCORE    = re.compile(r'''
                            \_
                            ''', re.MULTILINE | re.VERBOSE)
 
+ICLOUD_DOMAINS = ['icloud.com', 'me.com', 'mac.com']
+ICLOUD_CANONICAL_DOMAIN = 'icloud.com'
+
 
 def validate(email_addr):
     # Setup for handling EmailAddress type instead of literal string
@@ -113,3 +116,13 @@ def _validate(localpart):
         return False
 
     return True
+
+
+def canonicalize(email_addr):
+    """
+    Returns the canonical form of an icloud address: everything after the
+    plus (+) is ignored, and me.com and mac.com are aliases of the same
+    icloud.com mailbox.
+    """
+    localpart = email_addr.mailbox.split('+')[0].lower()
+    return u'{}@{}'.format(localpart, ICLOUD_CANONICAL_DOMAIN)
@@ -185,3 +185,12 @@ def _validate_disposable(email_addr):
 
 def managed_email(hostname):
     return hostname in YAHOO_MANAGED
+
+
+def canonicalize(email_addr):
+    """
+    Returns the canonical form of a yahoo address: disposable AddressGuard
+    addresses (base-keyword) are delivered to the base mailbox.
+    """
+    localpart = email_addr.mailbox.split('-')[0].lower()
+    return u'{}@{}'.format(localpart, email_addr.hostname)
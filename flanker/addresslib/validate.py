@@ -24,6 +24,11 @@ Public Functions in flanker.addresslib.validate module:
       Looks up the custom grammar plugin for a given ESP via the mail
       exchanger.
 
+    * plugin_for_domain(domain)
+
+      Looks up the custom grammar plugin for a well known ESP domain without
+      any DNS lookups.
+
     * mail_exchanger_lookup(domain)
 
       Looks up the mail exchanger for a given domain.
@@ -65,6 +70,13 @@ _CUSTOM_GRAMMAR_LIST = [
     (_GOOGLE_PATTERN, google),
 ]
 
+_DOMAIN_PLUGINS = dict(
+    [(domain, yahoo) for domain in yahoo.YAHOO_MANAGED] +
+    [(domain, gmail) for domain in gmail.GMAIL_DOMAINS] +
+    [(domain, aol) for domain in aol.AOL_DOMAINS] +
+    [(domain, icloud) for domain in icloud.ICLOUD_DOMAINS] +
+    [(domain, hotmail) for domain in hotmail.HOTMAIL_DOMAINS])
+
 _mx_cache = None
 _dns_lookup = None
 
@@ -132,6 +144,19 @@ def plugin_for_esp(mail_exchanger):
     return None
 
 
+def plugin_for_domain(domain):
+    """
+    Returns the custom grammar plugin for a well known ESP domain, e.g.
+    gmail.com or yahoo.com, or None if the domain is not known. Unlike
+    plugin_for_esp() this does not require a mail exchanger lookup, so it
+    can not detect ESPs hosting custom domains (e.g. Google Apps).
+    """
+    if not domain:
+        return None
+
+    return _DOMAIN_PLUGINS.get(domain.lower())
+
+
 @metrics_wrapper()
 def mail_exchanger_lookup(domain, metrics=False):
     """
@@ -35,6 +35,32 @@ Examples
 >> from flanker import mime
 >> msg = mime.from_string(message_string)
 
+# or parse a message stored in a file without reading it into memory
+>> msg = mime.from_file('/var/spool/message.eml')
+
+# parse just the top level headers, the rest of the message is scanned
+# only if its parts or body are accessed
+>> msg = mime.from_string(message_string, headers_only=True)
+>> headers = mime.headers_from_string(message_string)
+
+# extract just the facts you need, decoding only what is needed for them
+>> mime.summarize(message_string, fields=('message_id', 'from', 'text'))
+
+# limit the cost of parsing untrusted messages, LimitExceeded is raised when
+# a limit is exceeded
+>> limits = mime.ParseLimits(max_parts=1000, max_depth=20,
+>>                           max_header_bytes=65536, timeout=0.5)
+>> msg = mime.from_string(message_string, limits=limits)
+
+# or feed it chunk by chunk as it arrives, headers of the message and its
+# parts are available as soon as they are received
+>> parser = mime.FeedParser()
+>> for chunk in chunks:
+>>     for event in parser.feed(chunk):
+>>         if isinstance(event, mime.PartHeaders):
+>>             route(event.headers)
+>> msg = parser.close()
+
 # unicode multi-value dictionary with headers
 msg.headers
 
@@ -59,9 +85,17 @@ if msg.content_type.is_message_container():
 
 read more in package details.
 """
-from flanker.mime.message.errors import DecodingError, EncodingError, MimeError
+from flanker.mime.message.errors import (DecodingError, EncodingError,
+                                         MimeError, LimitExceeded)
+from flanker.mime.message.limits import ParseLimits
+from flanker.mime.summary import summarize
 from flanker.mime import create
-from flanker.mime.create import from_string
+from flanker.mime.create import from_string, from_file, headers_from_string
+from flanker.mime.message.scanner import FeedParser, PartHeaders
 from flanker.mime.message.fallback.create import from_string as recover
 from flanker.mime.message.utils import python_message_to_string
 from flanker.mime.message.headers.parametrized import fix_content_type
+from flanker.mime.message.headers.encodedword import (enable_decode_cache,
+                                                      disable_decode_cache,
+                                                      decode_cache_info,
+                                                      report_decode_cache_metrics)
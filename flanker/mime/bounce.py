@@ -56,7 +56,13 @@ def _collect_headers(message):
 
 def _collect_headers_from_status(body):
     out = deque()
-    with closing(six.StringIO(body)) as stream:
+    # delivery status is not a text part, so its body is not decoded
+    if isinstance(body, six.binary_type):
+        stream = six.BytesIO(body)
+    else:
+        stream = six.StringIO(body)
+
+    with closing(stream):
         for i in range(3):
             out += parse_stream(stream)
 
@@ -0,0 +1,149 @@
+"""
+Bulk parsing of mailboxes: mbox files and maildir directories.
+
+Messages are parsed across a pool of processes. Only message locations are
+sent to the workers, the workers read and parse the messages themselves and
+send back lightweight summaries instead of message trees.
+
+    >>> from flanker.mime import bulk
+    >>> for summary in bulk.parse(bulk.iter_mbox('/var/mail/bob')):
+    ...     print(summary['headers'].get('Message-Id'), summary['size'])
+
+A summary is a dict with the requested fields, see flanker.mime.summary,
+headers and attachments by default, and the following keys:
+
+    * source - Source of the message.
+    * size - size of the message in bytes, or None if it could not be read.
+    * error - None, or the error message if the message failed to be read or
+      parsed. The fields of such a message have empty values.
+
+Any picklable function that takes a MimePart and returns a dict with the
+fields can be passed as summarizer.
+"""
+import mmap
+import os
+from contextlib import closing
+from multiprocessing import Pool
+
+import attr
+import six
+
+from flanker.mime.create import from_string
+from flanker.mime.summary import empty_summary, summarize_message
+
+_MBOX_SEPARATOR = b'From '
+FIELDS = ('headers', 'attachments')
+
+
+@attr.s(frozen=True)
+class Source(object):
+    """Location of a message, length is None for the whole file."""
+    path = attr.ib()
+    offset = attr.ib(default=0)
+    length = attr.ib(default=None)
+
+    def read(self):
+        with open(self.path, 'rb') as f:
+            if self.length is None:
+                return f.read()
+            f.seek(self.offset)
+            return f.read(self.length)
+
+
+def iter_mbox(path):
+    """Yields the sources of messages in an mbox file. Messages are split on
+    the `From ` lines, the lines themselves are not included."""
+    if os.path.getsize(path) == 0:
+        return
+
+    with open(path, 'rb') as f:
+        with closing(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)) as m:
+            for start, end in _split_mbox(m):
+                yield Source(path, start, end - start)
+
+
+def _split_mbox(m):
+    size = len(m)
+    start = 0
+    while start < size:
+        # skip the `From ` line
+        if m[start:start + len(_MBOX_SEPARATOR)] == _MBOX_SEPARATOR:
+            start = m.find(b'\n', start)
+            start = size if start < 0 else start + 1
+
+        end = m.find(b'\n' + _MBOX_SEPARATOR, start)
+        end = size if end < 0 else end + 1
+        if end > start:
+            yield start, end
+        start = end
+
+
+def iter_maildir(path):
+    """Yields the sources of messages in the `new` and `cur` subdirectories
+    of a maildir."""
+    for subdir in ('new', 'cur'):
+        directory = os.path.join(path, subdir)
+        if not os.path.isdir(directory):
+            continue
+
+        for name in sorted(os.listdir(directory)):
+            if not name.startswith('.'):
+                yield Source(os.path.join(directory, name))
+
+
+def parse(sources, processes=None, chunksize=64, summarizer=None,
+          fields=FIELDS):
+    """Parses messages and yields their summaries in the order of sources.
+
+    processes is the size of the pool, os.cpu_count() by default, 1 parses
+    in the calling process. Sources are sent to the workers in chunks of
+    chunksize.
+    """
+    # unknown fields raise ValueError before the pool is started
+    empty_summary(fields)
+    tasks = ((source, summarizer, fields) for source in sources)
+    if processes == 1:
+        for summary in six.moves.map(_parse_one, tasks):
+            yield summary
+        return
+
+    pool = Pool(processes)
+    try:
+        for summary in pool.imap(_parse_one, tasks, chunksize):
+            yield summary
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def parse_mbox(path, **kwargs):
+    return parse(iter_mbox(path), **kwargs)
+
+
+def parse_maildir(path, **kwargs):
+    return parse(iter_maildir(path), **kwargs)
+
+
+def _parse_one(task):
+    source, summarizer, fields = task
+    size = None
+    try:
+        # maildir messages may be moved or deleted while they are parsed
+        string = source.read()
+        size = len(string)
+        message = from_string(string)
+        if summarizer is None:
+            summary = summarize_message(message, fields)
+        else:
+            summary = summarizer(message)
+        summary['error'] = None
+    except Exception as e:
+        summary = empty_summary(fields)
+        summary['error'] = str(e)
+
+    summary['source'] = source
+    summary['size'] = size
+    return summary
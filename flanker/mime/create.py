@@ -1,5 +1,7 @@
 """ This package is a set of utilities and methods for building mime messages """
 
+import mmap
+import os
 import uuid
 from flanker.mime import DecodingError
 from flanker.mime.message import ContentType, utils
@@ -79,8 +81,49 @@ def attachment(content_type, body, filename=None,
         charset, True)
 
 
-def from_string(string):
-    return scanner.scan(string)
+def from_string(string, headers_only=False, limits=None):
+    """Parses a message. With headers_only only the top level headers are
+    parsed upfront, the rest of the message is scanned when its parts are
+    accessed for the first time. limits is a ParseLimits object.
+    """
+    if headers_only:
+        return scanner.scan_headers(string, limits)
+    return scanner.scan(string, limits)
+
+
+def headers_from_string(string, limits=None):
+    """Returns the top level headers of a message without scanning its body.
+    """
+    return scanner.scan_headers(string, limits).headers
+
+
+def from_file(path_or_fd, headers_only=False, limits=None):
+    """Parses a message stored in a file given as a path, a file descriptor
+    or a file object. The file is memory mapped and scanned in place, parts
+    refer to the mapping, so only the pages that are accessed are read.
+
+    The file should not be modified while the message is in use.
+    """
+    if isinstance(path_or_fd, int):
+        return _from_fd(path_or_fd, headers_only, limits)
+
+    if hasattr(path_or_fd, 'fileno'):
+        return _from_fd(path_or_fd.fileno(), headers_only, limits)
+
+    fd = os.open(path_or_fd, os.O_RDONLY)
+    try:
+        return _from_fd(fd, headers_only, limits)
+    finally:
+        os.close(fd)
+
+
+def _from_fd(fd, headers_only, limits):
+    # empty files can not be mapped
+    if os.fstat(fd).st_size == 0:
+        return from_string(b'', headers_only, limits)
+
+    return from_string(mmap.mmap(fd, 0, access=mmap.ACCESS_READ),
+                       headers_only, limits)
 
 
 def from_python(message):
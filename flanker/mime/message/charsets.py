@@ -1,7 +1,10 @@
 import codecs
 
+import cchardet
+import chardet
 import six
 
+from flanker.mime.message.errors import DecodingError
 from flanker.mime.message.utils import to_unicode
 
 _ALIASES = {
@@ -23,6 +26,30 @@ def convert_to_unicode(charset, value):
     return value
 
 
+def incremental_decoder(charset, errors='replace'):
+    """
+    Returns an incremental decoder for the charset. Unlike convert_to_unicode
+    it can not guess the charset of broken input, see guess_incremental_decoder.
+    """
+    return codecs.getincrementaldecoder(_ensure_charset(charset))(errors)
+
+
+def guess_incremental_decoder(sample):
+    """
+    Returns an incremental decoder for the charset guessed from the sample,
+    the way convert_to_unicode guesses the charset of input that does not
+    decode with the given one.
+    """
+    for detector in (cchardet, chardet):
+        charset = detector.detect(sample)['encoding']
+        try:
+            return codecs.getincrementaldecoder(charset)('replace')
+        except (LookupError, TypeError):
+            pass
+
+    raise DecodingError('Failed to guess encoding')
+
+
 def _ensure_charset(charset):
     charset = charset.lower()
     try:
@@ -14,3 +14,26 @@ class EncodingError(MimeError):
 
     def __str__(self):
         return MimeError.__str__(self)[:256]
+
+
+# max_parts keeps the message it had before the other limits were added
+_LIMIT_MESSAGES = {
+    'max_parts': "Too many parts: {1}, max is {2}",
+}
+
+
+class LimitExceeded(DecodingError):
+    """Thrown when a message exceeds one of the parse limits, see
+    flanker.mime.message.limits.ParseLimits.
+
+    `limit` is the name of the exceeded limit, `value` is the value that
+    exceeded it and `max_value` is the limit value.
+    """
+
+    def __init__(self, limit, value, max_value):
+        template = _LIMIT_MESSAGES.get(limit,
+                                       "{0} limit exceeded: {1}, max is {2}")
+        DecodingError.__init__(self, template.format(limit, value, max_value))
+        self.limit = limit
+        self.value = value
+        self.max_value = max_value
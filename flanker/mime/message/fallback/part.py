@@ -2,9 +2,9 @@ import logging
 import email
 
 import six
-from webob.multidict import MultiDict
 from flanker.mime.message.charsets import convert_to_unicode
 from flanker.mime.message.headers.headers import remove_newlines, MimeHeaders
+from flanker.mime.message.headers.multidict import MultiDict
 from flanker.mime.message.part import RichPartMixin
 from flanker.mime.message.scanner import ContentType
 from flanker.mime.message import utils, headers
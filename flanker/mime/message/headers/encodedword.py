@@ -1,16 +1,24 @@
 # coding:utf-8
+import binascii
 import email.base64mime
-import email.quoprimime
 import logging
 from base64 import b64encode
 
+import attr
 import regex as re
 import six
 
+from flanker import metrics
 from flanker.mime.message import charsets, errors
 
 _log = logging.getLogger(__name__)
 
+# decoded header values by raw value, None unless enable_decode_cache is called
+_cache = None
+_max_cached = 0
+_hits = 0
+_misses = 0
+
 _RE_FOLDING_WHITE_SPACES = re.compile(r"(\n\r?|\r\n?)(\s*)")
 
 # This spec refers to http://tools.ietf.org/html/rfc2047
@@ -24,6 +32,8 @@ _RE_ENCODED_WORD = re.compile(r'''(?P<encodedWord>
   \?=                  # literal ?=
 )''', re.VERBOSE | re.IGNORECASE | re.MULTILINE)
 
+_RE_STRAY_EQUALS = re.compile(b'=(?![0-9A-Fa-f]{2})')
+
 
 def unfold(value):
     """
@@ -32,7 +42,61 @@ def unfold(value):
     treated in its unfolded form for further syntactic and semantic
     evaluation.
     """
-    return re.sub(_RE_FOLDING_WHITE_SPACES, r'\2', value)
+    return _RE_FOLDING_WHITE_SPACES.sub(r'\2', value)
+
+
+def enable_decode_cache(max_size=1024):
+    """
+    Turns on a process wide cache of decoded header values. Subjects, display
+    names and file names of bulk mail repeat verbatim, the cache decodes them
+    once. It keeps up to max_size values and is emptied when full. Hits and
+    misses are counted, see decode_cache_info.
+    """
+    global _cache, _max_cached, _hits, _misses
+    _max_cached = max_size
+    _hits = _misses = 0
+    _cache = {}
+
+
+def disable_decode_cache():
+    global _cache
+    _cache = None
+
+
+@attr.s(frozen=True)
+class DecodeCacheInfo(object):
+    hits = attr.ib()
+    misses = attr.ib()
+    max_size = attr.ib()
+    size = attr.ib()
+
+
+def decode_cache_info(reset=False):
+    """
+    Returns hits and misses of the decode cache since it was enabled, along
+    with its size. Lookups are only counted in memory, callers report them
+    to their metrics in batches. With reset=True the counters start over, so
+    a lookup is not reported twice.
+    """
+    global _hits, _misses
+    cache = _cache
+    info = DecodeCacheInfo(_hits, _misses, _max_cached,
+                           len(cache) if cache is not None else 0)
+    if reset:
+        _hits = _misses = 0
+    return info
+
+
+def report_decode_cache_metrics():
+    """
+    Reports the hits and misses of the decode cache counted since the last
+    report as encodedword.cache.hit and encodedword.cache.miss metrics, and
+    starts the counters over. Call it once per batch of messages rather than
+    per lookup.
+    """
+    info = decode_cache_info(reset=True)
+    metrics.incr('encodedword.cache.hit', info.hits)
+    metrics.incr('encodedword.cache.miss', info.misses)
 
 
 def decode(header):
@@ -56,6 +120,27 @@ def mime_to_unicode(header):
     if not isinstance(header, six.string_types):
         return header
 
+    global _hits, _misses
+
+    # only native strings are cached, see parsing.normalize
+    cache = _cache
+    if cache is None or type(header) is not str:
+        return _mime_to_unicode(header)
+
+    decoded = cache.get(header)
+    if decoded is not None:
+        _hits += 1
+        return decoded
+
+    _misses += 1
+    decoded = _mime_to_unicode(header)
+    if len(cache) >= _max_cached:
+        cache.clear()
+    cache[header] = decoded
+    return decoded
+
+
+def _mime_to_unicode(header):
     try:
         header = unfold(header)
         decoded = []  # decoded parts
@@ -122,35 +207,15 @@ def _decode_part(charset, encoding, value):
 
 
 def _decode_quoted_printable(qp):
-    if six.PY2:
-        return email.quoprimime.header_decode(str(qp))
-
-    buf = bytearray()
-    size = len(qp)
-    i = 0
-    while i < size:
-        ch = qp[i]
-        i += 1
-        if ch == '_':
-            buf.append(ord(' '))
-            continue
-
-        if ch != '=':
-            buf.append(ord(ch))
-            continue
-
-        # If there is no enough characters left, then treat them as is.
-        if size - i < 2:
-            buf.append(ord(ch))
-            continue
-
-        try:
-            codepoint = int(qp[i:i + 2], 16)
-        except ValueError:
-            buf.append(ord(ch))
-            continue
-
-        buf.append(codepoint)
-        i += 2
-
-    return six.binary_type(buf)
+    if isinstance(qp, six.text_type):
+        qp = qp.encode('latin-1')
+
+    # binascii drops or merges "=" that do not start an escape, those are
+    # kept as is. Every escape makes the value 2 bytes shorter, so a stray
+    # "=" changes the length of the result, a soft line break does not.
+    decoded = binascii.a2b_qp(qp, header=True)
+    if (len(qp) - len(decoded) != 2 * qp.count(b'=') or
+            b'=\r' in qp or b'=\n' in qp):
+        decoded = binascii.a2b_qp(_RE_STRAY_EQUALS.sub(b'=3D', qp),
+                                  header=True)
+    return decoded
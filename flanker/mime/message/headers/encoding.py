@@ -3,6 +3,7 @@ import logging
 from collections import deque
 from email.header import Header
 
+import regex as re
 import six
 
 import flanker.addresslib.address
@@ -19,6 +20,11 @@ _MAX_HEADER_LENGTH = 8000
 
 _ADDRESS_HEADERS = ('From', 'To', 'Delivered-To', 'Cc', 'Bcc', 'Reply-To')
 
+# email.header.Header returns printable ascii values without leading
+# whitespace as is, if they fit on the first line with the header name
+_RE_PRINTABLE_ASCII = re.compile(r'[\x21-\x7e][\x20-\x7e\t]*\Z')
+_MAX_UNFOLDED_LENGTH = 75
+
 
 def to_mime(key, value):
     if not value:
@@ -45,6 +51,8 @@ def encode(name, value):
 def _encode_unstructured(name, value):
     if len(value) > _MAX_HEADER_LENGTH:
         return to_utf8(value)
+    if _fits_first_line(name, value):
+        return str(value)
     try:
         return Header(
             value.encode("ascii"), "ascii",
@@ -97,5 +105,11 @@ def encode_string(name, value, maxlinelen=None):
     return header.encode(splitchars=' ;,')
 
 
+def _fits_first_line(name, value):
+    return (isinstance(value, six.string_types) and
+            len(name) + 2 + len(value) <= _MAX_UNFOLDED_LENGTH and
+            _RE_PRINTABLE_ASCII.match(value) is not None)
+
+
 def _is_address_header(key, val):
     return key in _ADDRESS_HEADERS and '@' in val
@@ -1,8 +1,9 @@
 import six
-from webob.multidict import MultiDict
 
 from flanker.mime.message.headers import encodedword
-from flanker.mime.message.headers.parsing import normalize, parse_stream
+from flanker.mime.message.headers.multidict import MultiDict
+from flanker.mime.message.headers.parsing import (normalize, parse_stream,
+                                                   LazyValue)
 from flanker.mime.message.headers.encoding import to_mime
 from flanker.mime.message.errors import EncodingError
 
@@ -18,11 +19,13 @@ class MimeHeaders(object):
                              for (key, val) in items])
         self.changed = False
         self.num_prepends = 0
+        # decoded values by raw value
+        self._decoded = {}
 
     def __getitem__(self, key):
         v = self._v.get(normalize(key), None)
         if v is not None:
-            return encodedword.decode(v)
+            return self._decode(v)
         return None
 
     def __len__(self):
@@ -38,19 +41,21 @@ class MimeHeaders(object):
         key = normalize(key)
         if key in self._v:
             self._v[key] = remove_newlines(value)
+            self._decoded.clear()
             self.changed = True
         else:
             self.prepend(key, remove_newlines(value))
 
     def __delitem__(self, key):
         del self._v[normalize(key)]
+        self._decoded.clear()
         self.changed = True
 
     def __nonzero__(self):
         return len(self._v) > 0
 
     def prepend(self, key, value):
-        self._v._items.insert(0, (normalize(key), remove_newlines(value)))
+        self._v.prepend(normalize(key), remove_newlines(value))
         self.num_prepends += 1
 
     def add(self, key, value):
@@ -83,6 +88,7 @@ class MimeHeaders(object):
         v = MultiDict(tracking_fn(key, val) for key, val in self.iteritems(raw=not decode))
         if changed[0]:
             self._v = v
+            self._decoded.clear()
             self.changed = True
 
     def items(self):
@@ -93,13 +99,15 @@ class MimeHeaders(object):
 
     def iteritems(self, raw=False):
         """
-        Returns iterator header,val pairs in the preserved order.
+        Returns iterator header,val pairs in the preserved order. The pairs
+        are the headers at the time of the call, so headers can be changed
+        while iterating, the values are decoded as they are iterated.
         """
+        items = list(self._v.iteritems())
         if raw:
-            return self._v.iteritems()
+            return ((k, _parsed(v)) for k, v in items)
 
-        return iter([(x[0], encodedword.decode(x[1]))
-                     for x in self._v.iteritems()])
+        return ((k, self._decode(v)) for k, v in items)
 
     def get(self, key, default=None):
         """
@@ -107,21 +115,35 @@ class MimeHeaders(object):
         """
         v = self._v.get(normalize(key), default)
         if v is not None:
-            return encodedword.decode(v)
+            return self._decode(v)
         return None
 
     def getraw(self, key, default=None):
         """
         Returns raw header value (case-insensitive, non-decoded.
         """
-        return self._v.get(normalize(key), default)
+        return _parsed(self._v.get(normalize(key), default))
 
     def getall(self, key):
         """
         Returns all header values by the given header name (case-insensitive).
         """
         v = self._v.getall(normalize(key))
-        return [encodedword.decode(x) for x in v]
+        return [self._decode(x) for x in v]
+
+    def _decode(self, value):
+        """
+        Decodes a value once, other calls with the same value return the
+        cached result. Parametrized values are not decoded.
+        """
+        value = _parsed(value)
+        if not isinstance(value, six.string_types):
+            return value
+
+        decoded = self._decoded.get(value)
+        if decoded is None:
+            decoded = self._decoded[value] = encodedword.decode(value)
+        return decoded
 
     def have_changed(self, ignore_prepends=False):
         """
@@ -130,15 +152,16 @@ class MimeHeaders(object):
         return self.changed or (self.num_prepends > 0 and not ignore_prepends)
 
     def __str__(self):
-        return str(self._v)
+        return str(MultiDict(self.iteritems(raw=True)))
 
     @classmethod
-    def from_stream(cls, stream):
+    def from_stream(cls, stream, limits=None):
         """
         Takes a stream and reads the headers, decodes headers to unicode dict
-        like object.
+        like object. Only the content headers are parsed right away, other
+        values are parsed when they are read.
         """
-        return cls(parse_stream(stream))
+        return cls(parse_stream(stream, limits, lazy=True))
 
     def to_stream(self, stream, prepends_only=False):
         """
@@ -156,6 +179,12 @@ class MimeHeaders(object):
             stream.write("{0}: {1}\r\n".format(h, to_mime(h, v)))
 
 
+def _parsed(value):
+    if type(value) is LazyValue:
+        return value.parse()
+    return value
+
+
 def remove_newlines(value):
     if not value:
         return ''
@@ -0,0 +1,88 @@
+"""
+Ordered dictionary with multiple values per key, MimeHeaders keeps the
+headers in it.
+"""
+from collections import deque
+
+
+class MultiDict(object):
+    """
+    Keeps (key, value) pairs in the order they were added and indexes the
+    values by key, so lookups do not scan the pairs. Pairs are added to
+    either end in constant time.
+
+    Keys are compared as is, MimeHeaders normalizes header names before
+    using them as keys.
+    """
+
+    def __init__(self, items=()):
+        self._items = deque(items)
+        self._index = index = {}
+        for key, value in self._items:
+            values = index.get(key)
+            if values is None:
+                index[key] = deque((value,))
+            else:
+                values.append(value)
+
+    def append(self, key, value):
+        self._items.append((key, value))
+        self._values(key).append(value)
+
+    def prepend(self, key, value):
+        self._items.appendleft((key, value))
+        self._values(key).appendleft(value)
+
+    def get(self, key, default=None):
+        """Returns the first value of the key."""
+        values = self._index.get(key)
+        if values:
+            return values[0]
+        return default
+
+    def getall(self, key):
+        """Returns all values of the key in order."""
+        return list(self._index.get(key, ()))
+
+    def keys(self):
+        return [key for key, _ in self._items]
+
+    def items(self):
+        return list(self._items)
+
+    def iteritems(self):
+        return iter(self._items)
+
+    def __getitem__(self, key):
+        values = self._index.get(key)
+        if not values:
+            raise KeyError(key)
+        return values[0]
+
+    def __setitem__(self, key, value):
+        """Replaces all values of the key with a value added at the end."""
+        if key in self._index:
+            del self[key]
+        self.append(key, value)
+
+    def __delitem__(self, key):
+        del self._index[key]
+        self._items = deque(item for item in self._items if item[0] != key)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return (key for key, _ in self._items)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, list(self._items))
+
+    def _values(self, key):
+        values = self._index.get(key)
+        if values is None:
+            values = self._index[key] = deque()
+        return values
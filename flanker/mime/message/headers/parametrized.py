@@ -82,14 +82,21 @@ def decode_parameters(string):
 
 
 def collect_parameters(rest):
-    """Scans the string and collects parts
-    that look like parameter, returns deque of strings
+    """Scans the string once and collects parts
+    that look like parameter, returns deque of parameters
     """
     parameters = deque()
-    p, rest = match_parameter(rest)
-    while p:
-        parameters.append(p)
-        p, rest = match_parameter(rest)
+    match = _RE_PARAMETER.match(rest)
+    while match:
+        if match.group('old_value') is not None:
+            parameters.append(parameter(
+                _PARAM_STYLE_OLD, match.group('old_name'),
+                match.group('old_value')))
+        else:
+            parameters.append(parameter(
+                _PARAM_STYLE_NEW, parse_parameter_name(match.group('name')),
+                match.group('value')))
+        match = _RE_PARAMETER.match(rest, match.end())
     return parameters
 
 
@@ -111,35 +118,6 @@ def concatenate(parts):
     return ''.join(decode_new_style(p) for p in partition(parts))
 
 
-def match_parameter(rest):
-    for match in (match_old, match_new):
-        p, rest = match(rest)
-        if p:
-            return p, rest
-
-    return None, rest
-
-
-def match_old(rest):
-    match = _RE_OLD_STYLE_PARAM.match(rest)
-    if match:
-        name = match.group('name')
-        value = match.group('value')
-        return parameter(_PARAM_STYLE_OLD, name, value), rest[match.end():]
-
-    return None, rest
-
-
-def match_new(rest):
-    match = _RE_NEW_STYLE_PARAM.match(rest)
-    if match:
-        name = parse_parameter_name(match.group('name'))
-        value = match.group('value')
-        return parameter(_PARAM_STYLE_NEW, name, value), rest[match.end():]
-
-    return None, rest
-
-
 def reverse(string):
     """Native reverse of a string looks a little bit cryptic,
     just a readable wrapper"""
@@ -261,65 +239,61 @@ _RE_HEADER_VALUE = re.compile(r'''
        [\ \t;]*''', re.IGNORECASE | re.VERBOSE)
 
 
-_RE_OLD_STYLE_PARAM = re.compile(r'''
-     # according to rfc1342, param value can be encoded-word
-     # and it's actually very popular, so detect this parameter first
-     ^
-     # skip spaces
-     [\ \t]*
-     # parameter name
-     (?P<name>
-         [^\x00-\x1f\s\(\)<>@,;:\\"/\[\]\?=]+
-     )
-     # skip spaces
-     [\ \t]*
-     =
-     # skip spaces
-     [\ \t]*
-     #optional quoting sign
-     "?
+# matches a single parameter starting at a given position,
+# old style parameters are tried first
+_RE_PARAMETER = re.compile(r'''
      # skip spaces
      [\ \t]*
-     # and a glorious encoded-word sequence
-     (?P<value>
-       =\?
-       .* # non-greedy to match the end sequence chars
-       \?=
-     )
-     # ends with optional quoting sign that we ignore
-     "?
-''', re.IGNORECASE | re.VERBOSE)
-
-_RE_NEW_STYLE_PARAM = re.compile(r'''
-     # Here we grab anything that looks like a parameter
-     ^
-     # skip spaces
-     [\ \t]*
-     # parameter name
-     (?P<name>
-         [^\x00-\x1f\s\(\)<>@,;:\\"/\[\]\?=]+
-     )
-     # skip spaces
-     [\ \t]*
-     =
-     # skip spaces
-     [\ \t]*
-     (?P<value>
-       (?:
-         "(?:
-             # so this works for unicode too
-             [^\x00-\x10\x12-\x19\x22\x5c\x7f]
-             |
-             (?:\\[\x21-\x7e\t\ ])
-          )+"
+     (?:
+       # according to rfc1342, param value can be encoded-word
+       # and it's actually very popular, so detect this parameter first
+       (?P<old_name>
+           [^\x00-\x1f\s\(\)<>@,;:\\"/\[\]\?=]+
        )
+       # skip spaces
+       [\ \t]*
+       =
+       # skip spaces
+       [\ \t]*
+       #optional quoting sign
+       "?
+       # skip spaces
+       [\ \t]*
+       # and a glorious encoded-word sequence
+       (?P<old_value>
+         =\?
+         .* # greedy, the value ends with the last end sequence chars
+         \?=
+       )
+       # ends with optional quoting sign that we ignore
+       "?
      |
-     # any (US-ASCII) CHAR except SPACE, CTLs, or tspecials
-     [^\x00-\x1f\s\(\)<>@,;:\\"/\[\]\?=]+
+       # Here we grab anything that looks like a new style parameter
+       (?P<name>
+           [^\x00-\x1f\s\(\)<>@,;:\\"/\[\]\?=]+
+       )
+       # skip spaces
+       [\ \t]*
+       =
+       # skip spaces
+       [\ \t]*
+       (?P<value>
+         (?:
+           "(?:
+               # so this works for unicode too
+               [^\x00-\x10\x12-\x19\x22\x5c\x7f]
+               |
+               (?:\\[\x21-\x7e\t\ ])
+            )+"
+         )
+       |
+       # any (US-ASCII) CHAR except SPACE, CTLs, or tspecials
+       [^\x00-\x1f\s\(\)<>@,;:\\"/\[\]\?=]+
+       )
+       # skip spaces
+       [\ \t]*
+       ;?
      )
-     # skip spaces
-     [\ \t]*
-     ;?
 ''', re.IGNORECASE | re.VERBOSE)
 
 _RE_REVERSE_CONTINUATION = re.compile(
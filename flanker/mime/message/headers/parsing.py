@@ -1,5 +1,6 @@
 import string
 import regex
+import six
 from collections import deque
 from flanker.mime.message.headers import encodedword, parametrized
 from flanker.mime.message.headers.wrappers import ContentType, WithParams
@@ -9,33 +10,97 @@ from flanker.utils import is_pure_ascii
 
 _RE_HEADER = regex.compile(r'^(From |[\041-\071\073-\176]+:|[\t ])')
 _MAX_LINE_LENGTH = 10000
+_EMPTY_LINES = ('\r\n', '\r', '\n', b'\r\n', b'\r', b'\n')
 
+# normalized header names by header name, canonical names map to themselves
+_normalized = {}
+_MAX_NORMALIZED = 1024
 
-def normalize(header_name):
-    return string.capwords(header_name.lower(), '-')
+# parsed Content-Type values by raw value, boundaries and charsets repeat a
+# lot in bulk mail
+_content_types = {}
+_MAX_CONTENT_TYPES = 1024
 
 
-def parse_stream(stream):
-    """Reads the incoming stream and returns list of tuples"""
+def normalize(header_name):
+    # only native strings are cached, on Python 2 a unicode name would get
+    # the cached str result of an equal str name
+    if type(header_name) is not str:
+        return string.capwords(header_name.lower(), '-')
+
+    normalized = _normalized.get(header_name)
+    if normalized is None:
+        if len(_normalized) >= _MAX_NORMALIZED:
+            _normalized.clear()
+        normalized = six.moves.intern(
+            string.capwords(header_name.lower(), '-'))
+        _normalized[header_name] = _normalized[normalized] = normalized
+    return normalized
+
+
+def parse_stream(stream, limits=None, lazy=False):
+    """Reads the incoming stream and returns list of tuples. With lazy=True
+    only the content headers are parsed, the other values are returned as
+    LazyValue."""
     out = deque()
-    for header in _unfold_header_lines(_read_header_lines(stream)):
-        out.append(parse_header(header))
+    for name, val in _read_headers(stream, limits):
+        out.append(_parse_header(name, val, lazy))
 
     return out
 
 
-def parse_header(header):
+def parse_header(header, lazy=False):
     """ Accepts a raw header with name, colons and newlines
     and returns it's parsed value
     """
-    name, val = _split_header(header)
+    name, val = _split_header(_decode_line(header))
+    return _parse_header(name, val, lazy)
+
+
+def _parse_header(name, val, lazy):
     if not is_pure_ascii(name):
         raise DecodingError('Non-ascii header name')
 
+    if lazy and not parametrized.is_parametrized(name, val):
+        return name, LazyValue(name, val)
+
     return name, parse_header_value(name, encodedword.unfold(val))
 
 
+class LazyValue(object):
+    """Header value that is parsed when it is read for the first time."""
+
+    def __init__(self, name, raw):
+        self._name = name
+        self._raw = raw
+        self._value = None
+
+    def parse(self):
+        if self._raw is not None:
+            self._value = parse_header_value(
+                self._name, encodedword.unfold(self._raw))
+            self._raw = None
+        return self._value
+
+
 def parse_header_value(name, val):
+    # only native strings are cached, see normalize
+    if name != 'Content-Type' or type(val) is not str:
+        return _parse_header_value(name, val)
+
+    content_type = _content_types.get(val)
+    if content_type is None:
+        if len(_content_types) >= _MAX_CONTENT_TYPES:
+            _content_types.clear()
+        content_type = _parse_header_value(name, val)
+        _content_types[val] = content_type
+
+    # parsed values are mutable, callers get a copy of the cached one
+    return ContentType(
+        content_type.main, content_type.sub, dict(content_type.params))
+
+
+def _parse_header_value(name, val):
     if not is_pure_ascii(val):
         val = to_unicode(val)
     if parametrized.is_parametrized(name, val):
@@ -52,12 +117,15 @@ def parse_header_value(name, val):
 
 
 def is_empty(line):
-    return line in ('\r\n', '\r', '\n')
+    return line in _EMPTY_LINES
 
 
-def _read_header_lines(fp):
-    """Read lines with headers until the start of body"""
-    lines = deque()
+def _read_headers(fp, limits=None):
+    """Reads lines with headers until the start of body and yields
+    (name, value) pairs, folded values keep their newlines"""
+    header = None
+    folded = None
+    size = 0
     for line in fp:
         if len(line) > _MAX_LINE_LENGTH:
             raise DecodingError('Line is too long: %d' % len(line))
@@ -65,58 +133,58 @@ def _read_header_lines(fp):
         if is_empty(line):
             break
 
+        raw_length = len(line)
+        if limits:
+            size += raw_length
+            limits.check_header_bytes(size)
+            limits.check_time()
+
+        line = _decode_line(line)
+
         # tricky case if it's not a header and not an empty line
         # ususally means that user forgot to separate the body and newlines
         # so "unread" this line here, what means to treat it like a body
         if not _RE_HEADER.match(line):
-            fp.seek(fp.tell() - len(line))
+            fp.seek(fp.tell() - raw_length)
             break
 
-        lines.append(line)
-
-    return lines
-
-
-def _unfold_header_lines(lines):
-    headers = deque()
-    for line in lines:
         # ignore unix from
         if line.startswith('From '):
             continue
 
-        # this is continuation
+        # this is continuation, ignored at the top of a part
         if line[0] in ' \t':
-            _extend_last_header(headers, line)
-            continue
-
-        headers.append(line)
-
-    new_headers = deque()
-    for h in headers:
-        if isinstance(h, deque):
-            new_headers.append(''.join(h).rstrip('\r\n'))
+            if header is not None:
+                if folded is None:
+                    folded = [header]
+                folded.append(line)
             continue
 
-        new_headers.append(h.rstrip('\r\n'))
+        if header is not None:
+            yield _split_header(_join_lines(header, folded))
+        header = line
+        folded = None
 
-    return new_headers
+    if header is not None:
+        yield _split_header(_join_lines(header, folded))
 
 
-def _extend_last_header(headers, line):
-    # Ignore continuation header lines at the top of a part.
-    if len(headers) == 0:
-        return
+def _join_lines(header, folded):
+    if folded is not None:
+        header = ''.join(folded)
+    return header.rstrip('\r\n')
 
-    header = headers.pop()
 
-    # If the latest header is already multiline then extend it.
-    if isinstance(header, deque):
-        header.append(line)
-        headers.append(header)
-        return
+def _decode_line(line):
+    """On Python 3 headers are read from the raw message bytes, decode them
+    the same way Python 2 decodes non-ascii header values"""
+    if six.PY2 or not isinstance(line, six.binary_type):
+        return line
 
-    # Convert the latest header to a multiline one.
-    headers.append(deque((header, line)))
+    try:
+        return line.decode('ascii')
+    except UnicodeDecodeError:
+        return to_unicode(line)
 
 
 def _split_header(header):
@@ -4,6 +4,7 @@ provide some convenience access methods
 
 from email.utils import make_msgid
 
+import attr
 import regex as re
 import six
 
@@ -27,12 +28,18 @@ class WithParams(tuple):
 class ContentType(tuple):
 
     def __new__(self, main, sub, params=None):
-        return tuple.__new__(
-            self, (main.lower() + '/' + sub.lower(), params or {}))
+        value = main.lower() + '/' + sub.lower()
+        if type(value) is str:
+            value = _COMMON_VALUES.get(value, value)
+        return tuple.__new__(self, (value, params or {}))
 
     def __init__(self, main, sub, params={}):
         self.main = main
         self.sub = sub
+        self._category = _category(main, sub)
+        types = tuple.__getitem__(self, 0).split('/')
+        self._format_type = types[0]
+        self._subtype = types[1]
 
     @property
     def value(self):
@@ -44,11 +51,11 @@ class ContentType(tuple):
 
     @property
     def format_type(self):
-        return tuple.__getitem__(self, 0).split('/')[0]
+        return self._format_type
 
     @property
     def subtype(self):
-        return tuple.__getitem__(self, 0).split('/')[1]
+        return self._subtype
 
     def is_content_type(self):
         return True
@@ -60,39 +67,34 @@ class ContentType(tuple):
         return False
 
     def is_singlepart(self):
-        return self.main != 'multipart' and\
-            self.main != 'message' and\
-            not self.is_headers_container()
+        return self._category.singlepart
 
     def is_multipart(self):
-        return self.main == 'multipart'
+        return self._category.multipart
 
     def is_headers_container(self):
-        return self.is_feedback_report() or \
-            self.is_rfc_headers() or \
-            self.is_message_external_body() or \
-            self.is_disposition_notification()
+        return self._category.headers_container
 
     def is_rfc_headers(self):
-        return self == 'text/rfc822-headers'
+        return self._category.rfc_headers
 
     def is_message_external_body(self):
-        return self == 'message/external-body'
+        return self._category.message_external_body
 
     def is_message_container(self):
-        return self == 'message/rfc822' or self == 'message/news'
+        return self._category.message_container
 
     def is_disposition_notification(self):
-        return self == 'message/disposition-notification'
+        return self._category.disposition_notification
 
     def is_delivery_status(self):
-        return self == 'message/delivery-status'
+        return self._category.delivery_status
 
     def is_feedback_report(self):
-        return self == 'message/feedback-report'
+        return self._category.feedback_report
 
     def is_delivery_report(self):
-        return self == 'multipart/report'
+        return self._category.delivery_report
 
     def get_boundary(self):
         return self.params.get("boundary")
@@ -134,6 +136,58 @@ class ContentType(tuple):
                                                       self.params)
 
 
+@attr.s(frozen=True, slots=True)
+class _Category(object):
+    """Predicates of a content type, they depend on the type only so every
+    ContentType of the type shares a single instance"""
+    singlepart = attr.ib(default=False)
+    multipart = attr.ib(default=False)
+    headers_container = attr.ib(default=False)
+    rfc_headers = attr.ib(default=False)
+    message_external_body = attr.ib(default=False)
+    message_container = attr.ib(default=False)
+    disposition_notification = attr.ib(default=False)
+    delivery_status = attr.ib(default=False)
+    feedback_report = attr.ib(default=False)
+    delivery_report = attr.ib(default=False)
+
+
+def _category(main, sub):
+    category = _CATEGORIES_BY_TYPE.get(main + '/' + sub)
+    if category is None:
+        category = _CATEGORIES_BY_MAIN.get(main, _SINGLEPART)
+    return category
+
+
+_SINGLEPART = _Category(singlepart=True)
+
+_CATEGORIES_BY_MAIN = {
+    'multipart': _Category(multipart=True),
+    'message': _Category(),
+}
+
+_CATEGORIES_BY_TYPE = {
+    'text/rfc822-headers': _Category(
+        headers_container=True, rfc_headers=True),
+    'message/external-body': _Category(
+        headers_container=True, message_external_body=True),
+    'message/rfc822': _Category(message_container=True),
+    'message/news': _Category(message_container=True),
+    'message/disposition-notification': _Category(
+        headers_container=True, disposition_notification=True),
+    'message/delivery-status': _Category(delivery_status=True),
+    'message/feedback-report': _Category(
+        headers_container=True, feedback_report=True),
+    'multipart/report': _Category(multipart=True, delivery_report=True),
+}
+
+# values of the most common types are shared by all ContentType instances
+_COMMON_VALUES = dict((v, v) for v in (
+    'text/plain', 'text/html', 'multipart/mixed', 'multipart/alternative',
+    'multipart/related', 'multipart/report', 'message/rfc822',
+    'message/delivery-status', 'application/octet-stream'))
+
+
 class MessageId(str):
 
     RE_ID = re.compile("<([^<>]+)>", re.I)
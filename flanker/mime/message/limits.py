@@ -0,0 +1,101 @@
+"""
+Limits enforced while a message is parsed, so that untrusted messages can be
+parsed with a predictable worst case cost. A violation raises LimitExceeded.
+
+    >>> limits = ParseLimits(max_parts=1000, max_depth=20,
+    ...                      max_header_bytes=64 * 1024, timeout=0.5)
+    >>> mime.from_string(message, limits=limits)
+"""
+import copy
+import time
+from contextlib import contextmanager
+
+from flanker.mime.message.errors import LimitExceeded
+
+_now = getattr(time, 'monotonic', time.time)
+
+
+class ParseLimits(object):
+    """
+    max_parts - max number of scanner operations, roughly the number of parts
+        and content type headers in the message.
+    max_depth - max nesting level of multipart and enclosed messages.
+    max_header_bytes - max size of a header section of the message or of any
+        of its parts.
+    timeout - time budget for the parse call in seconds, the clock runs only
+        while the limits are not paused.
+
+    None means no limit.
+    """
+
+    def __init__(self, max_parts=500, max_depth=None, max_header_bytes=None,
+                 timeout=None):
+        self.max_parts = max_parts
+        self.max_depth = max_depth
+        self.max_header_bytes = max_header_bytes
+        self.timeout = timeout
+        self.deadline = None
+        self._started = False
+        self._remaining = None
+
+    def start(self):
+        """
+        Returns a copy of the limits for a parse call, its time budget
+        starts now. Limits that have been started already are returned as is.
+        """
+        if self._started:
+            return self
+
+        started = copy.copy(self)
+        started._started = True
+        if self.timeout is not None:
+            started.deadline = _now() + self.timeout
+        return started
+
+    def pause(self):
+        """
+        Stops the clock, the time until resume() does not count against the
+        timeout and check_time() does nothing meanwhile.
+        """
+        if self.deadline is not None:
+            self._remaining = self.deadline - _now()
+            self.deadline = None
+
+    def resume(self):
+        if self._remaining is not None:
+            self.deadline = _now() + self._remaining
+            self._remaining = None
+
+    @contextmanager
+    def running(self):
+        """
+        Runs the clock of paused limits for the duration of the block.
+        """
+        self.resume()
+        try:
+            yield self
+        finally:
+            self.pause()
+
+    def check_parts(self, value):
+        if self.max_parts is not None and value > self.max_parts:
+            raise LimitExceeded('max_parts', value, self.max_parts)
+
+    def check_depth(self, value):
+        if self.max_depth is not None and value > self.max_depth:
+            raise LimitExceeded('max_depth', value, self.max_depth)
+
+    def check_header_bytes(self, value):
+        if self.max_header_bytes is not None and value > self.max_header_bytes:
+            raise LimitExceeded('max_header_bytes', value,
+                                self.max_header_bytes)
+
+    def check_time(self):
+        if self.deadline is not None:
+            now = _now()
+            if now > self.deadline:
+                raise LimitExceeded(
+                    'timeout', now - self.deadline + self.timeout, self.timeout)
+
+
+DEFAULT_LIMITS = ParseLimits()
@@ -1,9 +1,12 @@
 import base64
+import binascii
+import codecs
 import email.encoders
 import imghdr
 import logging
 import mimetypes
-import quopri
+import mmap
+import re
 from contextlib import closing
 from email.mime import audio
 from os import path
@@ -22,15 +25,18 @@ from flanker.utils import is_pure_ascii
 log = logging.getLogger(__name__)
 
 CTE = WithParams('7bit', {})
+_CHUNK_SIZE = 64 * 1024
 
 class Stream(object):
 
-    def __init__(self, content_type, start, end, string, stream):
+    def __init__(self, content_type, start, end, string, limits=None):
         self.content_type = content_type
         self.start = start
         self.end = end
         self.string = string
-        self.stream = stream
+        # limits of the scan that found the part, by the time the headers
+        # are loaded the scan is over and only the sizes are checked
+        self._limits = limits
 
         self._headers = None
         self._body_start = None
@@ -53,28 +59,49 @@ class Stream(object):
         self._set_body(value)
 
     def read_message(self):
-        self.stream.seek(self.start)
-        return self.stream.read(self.end - self.start + 1)
+        return self.string[self.start:self.end + 1]
+
+    def iter_message(self, chunk_size):
+        return _iter_slices(self.string, self.start, self.end + 1, chunk_size)
 
     def read_body(self):
         self._load_headers()
-        self.stream.seek(self._body_start)
-        return self.stream.read(self.end - self._body_start + 1)
+        return self.string[self._body_start:self.end + 1]
 
     def _load_headers(self):
         if self._headers is None:
-            self.stream.seek(self.start)
-            self._headers = headers.MimeHeaders.from_stream(self.stream)
-            self._body_start = self.stream.tell()
+            lines = BufferReader(self.string, self.start)
+            self._headers = headers.MimeHeaders.from_stream(lines,
+                                                            self._limits)
+            self._body_start = lines.tell()
+
+    def iter_raw_body(self, chunk_size):
+        self._load_headers()
+        return _iter_slices(self.string, self._body_start, self.end + 1,
+                            chunk_size)
+
+    def iter_body(self, chunk_size):
+        if self._body is not None:
+            return _iter_chunks(self._body, chunk_size)
+
+        content_type = self.content_type
+        content_encoding = self.headers.get(
+            'Content-Transfer-Encoding', CTE).value
+        decoder = None
+        if content_type.main == 'text':
+            chunks = iter_decode_transfer_encoding(
+                content_encoding, self.iter_raw_body(chunk_size))
+            decoder = _text_decoder(content_type.get_charset(), chunks)
+
+        return iter_decode_body(content_type, content_encoding,
+                                self.iter_raw_body(chunk_size), decoder)
 
     def _load_body(self):
         if self._body is None:
-            self._load_headers()
-            self.stream.seek(self._body_start)
             self._body = decode_body(
                 self.content_type,
                 self.headers.get('Content-Transfer-Encoding', CTE).value,
-                self.stream.read(self.end - self._body_start + 1))
+                self.read_body())
 
     def _set_body(self, value):
         if value != self._body:
@@ -92,6 +119,41 @@ class Stream(object):
         return self._body_changed
 
 
+class BufferReader(object):
+    """Line iterator over the message buffer (a string or a memory mapped
+    file) starting at the given position. It supports seek() and tell() so
+    the headers parser can use it like a file, but it only copies the lines
+    that are actually read.
+    """
+
+    def __init__(self, buf, position=0):
+        self.buf = buf
+        self.position = position
+
+    def seek(self, position):
+        self.position = position
+
+    def tell(self):
+        return self.position
+
+    def readline(self):
+        start = self.position
+        end = self.buf.find(b'\n', start)
+        self.position = len(self.buf) if end == -1 else end + 1
+        return self.buf[start:self.position]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration()
+        return line
+
+    next = __next__
+
+
 def adjust_content_type(content_type, body=None, filename=None):
     """Adjust content type based on filename or body contents
     """
@@ -385,11 +447,42 @@ class RichPartMixin(object):
 
 class MimePart(RichPartMixin):
 
-    def __init__(self, container, parts=None, enclosed=None, is_root=False):
+    def __init__(self, container, parts=None, enclosed=None, is_root=False,
+                 loader=None):
         RichPartMixin.__init__(self, is_root)
         self._container = container
-        self.parts = parts or []
-        self.enclosed = enclosed
+        self._parts = parts or []
+        self._enclosed = enclosed
+        # a callable that builds the parts and the enclosed message on first
+        # access and returns them, see scanner.traverse
+        self._loader = loader
+
+    @property
+    def parts(self):
+        self._complete()
+        return self._parts
+
+    @parts.setter
+    def parts(self, value):
+        self._complete()
+        self._parts = value
+
+    @property
+    def enclosed(self):
+        self._complete()
+        return self._enclosed
+
+    @enclosed.setter
+    def enclosed(self, value):
+        self._complete()
+        self._enclosed = value
+
+    def _complete(self):
+        if self._loader is not None:
+            parts, enclosed = self._loader()
+            self._loader = None
+            self._parts = parts or []
+            self._enclosed = enclosed
 
     @property
     def size(self):
@@ -400,6 +493,9 @@ class MimePart(RichPartMixin):
             else:
                 return sum(part._container.size
                            for part in self.walk(with_self=True))
+        elif isinstance(self._container, Stream) and not self.was_changed():
+            # unchanged parts are serialized as is, no need to copy them
+            return self._container.end + 1 - self._container.start
         else:
             with closing(_CounterIO()) as out:
                 self.to_stream(out)
@@ -448,6 +544,31 @@ class MimePart(RichPartMixin):
                 or self.content_type.is_delivery_status():
             self._container.body = value
 
+    def iter_body(self, chunk_size=_CHUNK_SIZE):
+        """
+        Returns an iterator over the decoded body. The body is read from the
+        message and decoded in chunks of about chunk_size, so memory usage
+        does not depend on the body size. Chunks are unicode for text parts
+        like the body. Text is read twice: the first pass checks that it
+        decodes with its charset. Otherwise the charset is guessed from the
+        first 64 KB of it, while the body guesses it from the whole text.
+        """
+        if not (self.content_type.is_singlepart() or
+                self.content_type.is_delivery_status()):
+            return iter(())
+
+        if isinstance(self._container, Stream):
+            return self._container.iter_body(chunk_size)
+
+        return _iter_chunks(self._container.body, chunk_size)
+
+    def body_to_file(self, fp, chunk_size=_CHUNK_SIZE):
+        """
+        Writes the decoded body to a file like object, see iter_body().
+        """
+        for chunk in self.iter_body(chunk_size):
+            fp.write(chunk)
+
     @property
     def charset(self):
         return self.content_type.get_charset()
@@ -472,7 +593,7 @@ class MimePart(RichPartMixin):
         if self.is_root() and not self.was_changed(ignore_prepends=True):
             with closing(six.StringIO()) as out:
                 self._container._stream_prepended_headers(out)
-                return out.getvalue() + self._container.string
+                return out.getvalue() + _to_native(self._container.string)
         else:
             with closing(six.StringIO()) as out:
                 self.to_stream(out)
@@ -484,19 +605,23 @@ class MimePart(RichPartMixin):
         """
         if not self.was_changed(ignore_prepends=True):
             self._container._stream_prepended_headers(out)
-            out.write(self._container.read_message())
+            _write_native(out, self._container.iter_message(_CHUNK_SIZE))
         else:
             try:
                 original_position = out.tell()
                 self._to_stream_when_changed(out)
             except DecodingError:
                 out.seek(original_position)
-                out.write(self._container.read_message())
+                _write_native(out, self._container.iter_message(_CHUNK_SIZE))
 
     def was_changed(self, ignore_prepends=False):
         if self._container.headers_changed(ignore_prepends):
             return True
 
+        # nobody could have changed the parts that have not been scanned yet
+        if self._loader is not None:
+            return self._container.body_changed()
+
         if self.content_type.is_singlepart():
             if self._container.body_changed():
                 return True
@@ -528,12 +653,13 @@ class MimePart(RichPartMixin):
         if ctype.is_singlepart():
 
             if self._container.body_changed():
-                charset, encoding, body = encode_body(self)
+                charset, encoding, chunks = iter_encode_body(self,
+                                                             _CHUNK_SIZE)
                 if charset:
                     self.charset = charset
                 self.content_encoding = WithParams(encoding)
             else:
-                body = self._container.read_body()
+                chunks = self._container.iter_raw_body(_CHUNK_SIZE)
 
             # RFC allows subparts without headers
             if self.headers:
@@ -542,7 +668,7 @@ class MimePart(RichPartMixin):
                 raise EncodingError("Root message should have headers")
 
             out.write(CRLF)
-            out.write(body)
+            _write_native(out, chunks)
         else:
             self.headers.to_stream(out)
             out.write(CRLF)
@@ -567,11 +693,84 @@ def decode_body(content_type, content_encoding, body):
     return decode_charset(content_type, body)
 
 
+def iter_decode_body(content_type, content_encoding, chunks, decoder=None):
+    """
+    Decodes the body given as an iterator over raw chunks, see decode_body.
+    Text is decoded with the incremental decoder if given, otherwise invalid
+    sequences are replaced, see _text_decoder.
+    """
+    chunks = iter_decode_transfer_encoding(content_encoding, chunks)
+    return iter_decode_charset(content_type, chunks, decoder)
+
+
+def iter_decode_transfer_encoding(encoding, chunks):
+    if encoding == 'base64':
+        return _iter_base64_decode(chunks)
+    elif encoding == 'quoted-printable':
+        return _iter_quoted_printable_decode(chunks)
+    else:
+        return chunks
+
+
+def iter_decode_charset(ctype, chunks, decoder=None):
+    if ctype.main != 'text':
+        for chunk in chunks:
+            yield chunk
+        return
+
+    charset = ctype.get_charset()
+    outlook_bug = ctype.sub == 'html' and charset == 'utf-8'
+    decoder = decoder or charsets.incremental_decoder(charset)
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if outlook_bug:
+            text = text.replace(u'\xa0', u'&nbsp;')
+        if text:
+            yield text
+
+    text = decoder.decode(b'', True)
+    if text:
+        yield text
+
+
+def _text_decoder(charset, chunks):
+    """
+    Returns the incremental decoder that decodes the text chunks the way
+    decode_charset decodes the whole text: a strict one for the charset if
+    all of the chunks decode with it, otherwise one for the charset guessed
+    from up to _CHUNK_SIZE bytes at the start of the text.
+    """
+    decoder = charsets.incremental_decoder(charset, 'strict')
+    sample = []
+    sample_size = 0
+    decodes = True
+    for chunk in chunks:
+        decodes = decodes and _decodes(decoder, chunk)
+        if sample_size < _CHUNK_SIZE:
+            sample.append(chunk)
+            sample_size += len(chunk)
+        elif not decodes:
+            break
+
+    if decodes and _decodes(decoder, b'', True):
+        return charsets.incremental_decoder(charset, 'strict')
+    return charsets.guess_incremental_decoder(
+        b''.join(sample)[:_CHUNK_SIZE])
+
+
+def _decodes(decoder, chunk, final=False):
+    try:
+        decoder.decode(chunk, final)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
 def decode_transfer_encoding(encoding, body):
     if encoding == 'base64':
         return _base64_decode(body)
     elif encoding == 'quoted-printable':
-        return quopri.decodestring(body)
+        return binascii.a2b_qp(body)
     else:
         return body
 
@@ -614,6 +813,43 @@ def encode_body(part):
     return charset, content_encoding, body
 
 
+def iter_encode_body(part, chunk_size=_CHUNK_SIZE):
+    """
+    Encodes the body like encode_body, but returns the encoded body as an
+    iterator over chunks. Text is encoded twice: the first pass only checks
+    the charset and the line lengths.
+    """
+    content_type = part.content_type
+    content_encoding = part.content_encoding.value
+    body = part._container.body
+
+    charset = content_type.get_charset()
+    if content_type.main == 'text':
+        charset, long_lines = _check_charset(charset, body, chunk_size)
+        chunks = _iter_encode_charset(charset, body, chunk_size)
+        if not part.is_attachment():
+            content_encoding = _choose_text_encoding(
+                charset, content_encoding, long_lines)
+            # report which text encoding is chosen
+            metrics.incr('encoding.' + content_encoding)
+        else:
+            content_encoding = 'base64'
+    else:
+        chunks = _iter_chunks(body, chunk_size)
+        content_encoding = 'base64'
+
+    if content_encoding == 'quoted-printable':
+        # look up the line ending of the first line, so that the encoder
+        # does not have to wait for the end of the first line, see
+        # _QuotedPrintableEncoder
+        newline = _first_line_end(
+            _iter_encode_charset(charset, body, chunk_size))
+        chunks = _iter_quoted_printable_encode(chunks, newline)
+    else:
+        chunks = iter_encode_transfer_encoding(content_encoding, chunks)
+    return charset, content_encoding, chunks
+
+
 def encode_charset(preferred_charset, text):
     try:
         charset = preferred_charset or 'ascii'
@@ -624,18 +860,52 @@ def encode_charset(preferred_charset, text):
     return charset, text
 
 
+def _check_charset(preferred_charset, text, chunk_size):
+    """
+    Returns the charset encode_charset would choose and whether the encoded
+    text has long lines, see has_long_lines.
+    """
+    try:
+        charset = preferred_charset or 'ascii'
+        chunks = _iter_encode_charset(preferred_charset, text, chunk_size)
+        return charset, _has_long_lines(chunks)
+    except:
+        return 'utf-8', False
+
+
+def _iter_encode_charset(charset, text, chunk_size):
+    encoder = codecs.getincrementalencoder(charset)()
+    for chunk in _iter_chunks(text, chunk_size):
+        yield encoder.encode(chunk)
+    yield encoder.encode(text[:0], True)
+
+
 def encode_transfer_encoding(encoding, body):
     if encoding == 'quoted-printable':
-        return quopri.encodestring(body, quotetabs=False)
+        return binascii.b2a_qp(body, quotetabs=False)
     elif encoding == 'base64':
         return email.encoders._bencode(body)
     else:
         return body
 
 
+def iter_encode_transfer_encoding(encoding, chunks):
+    if encoding == 'quoted-printable':
+        return _iter_quoted_printable_encode(chunks)
+    elif encoding == 'base64':
+        return _iter_base64_encode(chunks)
+    else:
+        return chunks
+
+
 def choose_text_encoding(charset, preferred_encoding, body):
+    return _choose_text_encoding(charset, preferred_encoding,
+                                 has_long_lines(body))
+
+
+def _choose_text_encoding(charset, preferred_encoding, long_lines):
     if charset in ('ascii', 'iso-8859-1', 'us-ascii'):
-        if has_long_lines(body):
+        if long_lines:
             return stronger_encoding(preferred_encoding, 'quoted-printable')
         else:
             return preferred_encoding
@@ -665,20 +935,271 @@ def has_long_lines(text, max_line_len=599):
     return False
 
 
+def _has_long_lines(chunks, max_line_len=599):
+    """has_long_lines for text given as an iterator over chunks."""
+    long_line = re.compile(b'[^\r\n]{%d}' % max_line_len)
+    line_len = 0
+    for chunk in chunks:
+        first = _RE_LINE_BREAK.search(chunk)
+        if not first:
+            line_len += len(chunk)
+        elif line_len + first.start() >= max_line_len:
+            return True
+        elif long_line.search(chunk):
+            return True
+        else:
+            line_len = len(chunk) - max(chunk.rfind(b'\n'),
+                                        chunk.rfind(b'\r')) - 1
+
+        if line_len >= max_line_len:
+            return True
+    return False
+
+
 def _base64_decode(s):
     """Recover base64 if it is broken."""
     try:
-        return base64.b64decode(s)
+        return binascii.a2b_base64(s)
 
-    except TypeError:
-        s = s.translate(None, _b64_invalid_chars)
+    # binascii.Error on Python 3, base64 raised TypeError on Python 2
+    except (binascii.Error, TypeError):
+        s = s.translate(None, _b64_invalid_bytes)
         tail_size = len(s) & 3
         if tail_size == 1:
             # crop last character as adding padding does not help
-            return base64.b64decode(s[:-1])
+            return binascii.a2b_base64(s[:-1])
 
         # add padding
-        return base64.b64decode(s + "=" * (4 - tail_size))
+        return binascii.a2b_base64(s + b'=' * (4 - tail_size))
+
+
+def _iter_base64_decode(chunks):
+    # like a2b_base64 the data ends with the first padding that completes a
+    # group, the other padding is dropped with the invalid chars and restored
+    # for the last group, the same way _base64_decode recovers broken base64
+    tail = b''
+    for chunk in chunks:
+        data, tail, ended = _split_base64_padding(
+            tail + chunk.translate(None, _b64_invalid_bytes_but_padding))
+        size = len(data) & ~3
+        if ended or not size:
+            tail = data + tail
+        else:
+            tail = data[size:] + tail
+            yield binascii.a2b_base64(data[:size])
+        if ended:
+            break
+
+    tail = tail.rstrip(b'=')
+    size = len(tail) & ~3
+    if size:
+        yield binascii.a2b_base64(tail[:size])
+    tail = tail[size:]
+    # a single char can not be decoded, it is cropped
+    if len(tail) > 1:
+        yield binascii.a2b_base64(tail + b'=' * (4 - len(tail)))
+
+
+def _split_base64_padding(s):
+    """
+    Returns the base64 chars of s without the padding, the chars left for the
+    next chunk and whether the padding that ends the data has been found.
+    Padding that ends the data comes after the third char of a group, or after
+    the second one if it is followed by another padding char.
+    """
+    data = []
+    start = 0
+    count = 0
+    while True:
+        pad = s.find(b'=', start)
+        if pad == -1:
+            data.append(s[start:])
+            return b''.join(data), b'', False
+
+        data.append(s[start:pad])
+        count += pad - start
+        if count & 3 == 3 or count & 3 == 2 and s[pad + 1:pad + 2] == b'=':
+            return b''.join(data), b'', True
+        if count & 3 == 2 and pad + 1 == len(s):
+            return b''.join(data), b'=', False
+        start = pad + 1
+
+
+def _iter_base64_encode(chunks):
+    # 57 bytes make a full 76 chars line, the last line is encoded separately
+    # as it may lose its newline, see email.encoders._bencode
+    tail = b''
+    for chunk in chunks:
+        chunk = tail + chunk
+        size = (len(chunk) - 1) // 57 * 57
+        tail = chunk[size:]
+        if size > 0:
+            yield _b64_encode_lines(chunk[:size])
+
+    if tail:
+        yield encode_transfer_encoding('base64', tail)
+
+
+def _iter_quoted_printable_encode(chunks, newline=None):
+    """
+    Encodes chunks the way encode_transfer_encoding encodes the whole body.
+    newline is the line ending of the first line when the caller knows it.
+    """
+    encoder = _QuotedPrintableEncoder(newline)
+    tail = b''
+    for chunk in chunks:
+        chunk = tail + chunk
+        # the last char waits for the next chunk unless it ends a line:
+        # how b2a_qp encodes a char depends on the char that follows it,
+        # whitespace and dots are encoded before CRLF for instance
+        size = len(chunk) if chunk.endswith(b'\n') else len(chunk) - 1
+        if (chunk[size - 1:size] in (b' ', b'\t', b'.') and
+                chunk[size:size + 1] in (b'\r', b'\0')):
+            size -= 1
+        tail = chunk[size:]
+        out = encoder.encode(chunk[:size]) if size > 0 else b''
+        if out:
+            yield out
+
+    out = encoder.encode(tail, final=True)
+    if out:
+        yield out
+
+
+class _QuotedPrintableEncoder(object):
+    """
+    Encodes a body piece by piece exactly like binascii.b2a_qp encodes it
+    whole, a line may be split between pieces.
+
+    b2a_qp breaks lines at 76 chars, so a piece that starts in the middle of
+    a line is prefixed with placeholder chars up to the column where the
+    line continues. A piece that ends in the middle of a line is followed by
+    one more placeholder, so that its last char is not encoded as the end of
+    the line. The placeholders are cut from the output.
+
+    b2a_qp ends the soft line breaks the way the first line of its input
+    ends. The pieces that follow are prefixed with an empty line ending the
+    same way, the output of the first line is held back until its end is
+    known unless newline is given.
+    """
+
+    def __init__(self, newline=None):
+        self.newline = newline
+        self.column = 0
+        self.pending = []
+
+    def encode(self, piece, final=False):
+        """
+        Encodes the piece and returns the output that is ready. Unless it is
+        final, the piece must not be followed by LF, nor by CR or NUL if it
+        ends with whitespace or a dot, see _iter_quoted_printable_encode.
+        """
+        prefix = (self.newline or b'') + b'a' * self.column
+        more = not final and not piece.endswith(b'\n')
+        data = prefix + piece + (b'a' if more else b'')
+        out = binascii.b2a_qp(data, quotetabs=False)
+        if more:
+            out = out[:-1]
+            self.column = len(out) - out.rfind(b'\n') - 1
+        else:
+            self.column = 0
+        out = out[len(prefix):]
+
+        if self.newline is None:
+            end = piece.find(b'\n')
+            if end < 0 and not final:
+                self.pending.append(out)
+                return b''
+            crlf = end > 0 and piece[end - 1:end] == b'\r'
+            self.newline = b'\r\n' if crlf else b'\n'
+
+        if self.pending:
+            # the pending output has only soft line breaks in it
+            pending = b''.join(self.pending)
+            if self.newline == b'\r\n':
+                pending = pending.replace(b'\n', b'\r\n')
+            out = pending + out
+            self.pending = []
+        return out
+
+
+def _first_line_end(chunks):
+    """
+    Returns the line ending of the first line b2a_qp would use for the
+    concatenated chunks.
+    """
+    last = b''
+    for chunk in chunks:
+        end = chunk.find(b'\n')
+        if end >= 0:
+            before = chunk[end - 1:end] if end else last
+            return b'\r\n' if before == b'\r' else b'\n'
+        last = chunk[-1:] or last
+    return b'\n'
+
+
+def _iter_quoted_printable_decode(chunks):
+    """
+    Decodes chunks the way decode_transfer_encoding decodes the whole body.
+    Only an escape the next chunk may complete waits for it, so a line may
+    be split between chunks.
+    """
+    tail = b''
+    for chunk in chunks:
+        chunk = tail + chunk
+        size, tail = len(chunk), b''
+        if not chunk.endswith(b'\n'):
+            m = _RE_QP_OPEN_ESCAPE.search(chunk, chunk.rfind(b'\n') + 1)
+            if m:
+                size = m.start(1)
+                # an escaped CR drops the rest of the line, see a2b_qp
+                tail = m.group(1)[:2]
+        if size:
+            yield binascii.a2b_qp(chunk[:size])
+
+    if tail:
+        yield binascii.a2b_qp(tail)
+
+
+def _iter_slices(string, start, end, chunk_size):
+    for i in range(start, end, chunk_size):
+        yield string[i:min(i + chunk_size, end)]
+
+
+def _iter_chunks(body, chunk_size):
+    if body:
+        for i in range(0, len(body), chunk_size):
+            yield body[i:i + chunk_size]
+
+
+def _write_native(out, chunks):
+    """
+    Writes chunks as native strings, see _to_native. A character may be
+    split between raw chunks on Python 3, so they are decoded incrementally.
+    """
+    if six.PY2:
+        for chunk in chunks:
+            out.write(chunk)
+        return
+
+    decoder = _native_decoder('surrogateescape')
+    for chunk in chunks:
+        if isinstance(chunk, six.binary_type):
+            chunk = decoder.decode(chunk)
+        out.write(chunk)
+    out.write(decoder.decode(b'', True))
+
+
+def _to_native(value):
+    """
+    Raw message slices and encoded bodies are bytes on Python 3, while the
+    message is serialized to a native string.
+    """
+    if isinstance(value, mmap.mmap):
+        value = value[:]
+    if six.PY3 and isinstance(value, six.binary_type):
+        return value.decode('utf-8', 'surrogateescape')
+    return value
 
 
 class _CounterIO(object):
@@ -698,10 +1219,16 @@ class _CounterIO(object):
 
 CRLF = "\r\n"
 
+_RE_LINE_BREAK = re.compile(b'[\r\n]')
+# "=" starts an escape unless it is the second one of "==", an escape at the
+# end of the line may be completed by the next chunk
+_RE_QP_OPEN_ESCAPE = re.compile(b'(?<!=)(?:==)*(=\r[^\n]*|=[0-9A-Fa-f]?)\Z')
+_native_decoder = codecs.getincrementaldecoder('utf-8')
+_b64_encode_lines = base64.encodebytes if six.PY3 else base64.encodestring
+
 
 # To recover base64 we need to translate the part to the base64 alphabet.
 _b64_alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
-_b64_invalid_chars = ""
-for ch in range(256):
-    if chr(ch) not in _b64_alphabet:
-        _b64_invalid_chars += chr(ch)
+_b64_invalid_bytes = bytes(bytearray(
+    ch for ch in range(256) if chr(ch) not in _b64_alphabet))
+_b64_invalid_bytes_but_padding = _b64_invalid_bytes.replace(b'=', b'')
@@ -1,32 +1,69 @@
+import mmap
 from collections import deque
+from contextlib import contextmanager
 from logging import getLogger
 
 import regex as re
 import six
 
 from flanker.mime.message.errors import DecodingError
-from flanker.mime.message.headers import parsing, is_empty, ContentType
-from flanker.mime.message.part import MimePart, Stream
+from flanker.mime.message.limits import DEFAULT_LIMITS
+from flanker.mime.message.headers import (parsing, is_empty, ContentType,
+                                          MimeHeaders)
+from flanker.mime.message.part import MimePart, Stream, BufferReader
 
 log = getLogger(__name__)
 
 
-def scan(string):
+def scan(string, limits=None):
     """Scanner that uses 1 pass to scan the entire message and
     build a message tree"""
 
-    if six.PY2:
-        if not isinstance(string, six.binary_type):
-            raise DecodingError('Scanner works with binary only')
-    else:
-        if isinstance(string, six.binary_type):
-            string = string.decode('utf-8')
+    string = _to_buffer(string)
+    started = (limits or DEFAULT_LIMITS).start()
+    try:
+        return _build_tree(tokenize(string, started), string, started)
+    finally:
+        # parts keep the limits for lazy header loads, those do not count
+        # against the timeout of this call
+        if started is not limits:
+            started.pause()
+
+
+def scan_headers(string, limits=None):
+    """Scans only the top level header section of the message. The rest of
+    the message is scanned when parts or the enclosed message are accessed
+    for the first time, DecodingError is raised then if it is malformed."""
+
+    string = _to_buffer(string)
+    started = (limits or DEFAULT_LIMITS).start()
+    lines = BufferReader(string)
+    headers = MimeHeaders.from_stream(lines, started)
+    body_start = lines.tell()
+
+    # the same content type scan() would have picked for the root
+    content_type = None
+    for token in tokenize(string[:body_start], started):
+        if isinstance(token, ContentType):
+            content_type = token
+            break
+
+    container = Stream(content_type or default_content_type(),
+                       0, len(string) - 1, string)
+    container._headers = headers
+    container._body_start = body_start
+    def load():
+        message = scan(string, limits)
+        return message.parts, message.enclosed
 
-    tokens = tokenize(string)
+    return MimePart(container, is_root=True, loader=load)
+
+
+def _build_tree(tokens, string, limits):
     if not tokens:
         tokens = [default_content_type()]
     try:
-        return traverse(Start(), TokensIterator(tokens, string))
+        return traverse(Start(), TokensIterator(tokens, string, limits))
     except DecodingError:
         raise
     except Exception as cause:
@@ -82,7 +119,6 @@ def traverse(pointer, iterator, parent=None, allow_bad_mime=False):
             raise DecodingError(
                 "Multipart message without boundary")
 
-        parts = deque()
         token = iterator.next()
 
         # we are expecting first boundary for multipart message
@@ -93,22 +129,22 @@ def traverse(pointer, iterator, parent=None, allow_bad_mime=False):
             raise DecodingError(
                 "Multipart message without starting boundary")
 
-        while True:
-            token = iterator.current()
-            if token.is_end():
-                break
-            if token == boundary and token.is_final():
-                iterator.next()
-                break
-            parts.append(traverse(token, iterator, content_type))
+        # the parts are only skipped here to find where the message ends,
+        # they are built when accessed for the first time
+        first = iterator.position
+        with iterator.skipping():
+            parts, token = traverse_parts(content_type, iterator)
+
+        def load():
+            return traverse_parts(content_type, iterator.fork(first))[0], None
 
         return make_part(
             content_type=content_type,
             start=pointer,
             end=token,
             iterator=iterator,
-            parts=parts,
-            parent=parent)
+            parent=parent,
+            loader=load)
 
     # this is a weird mime part, actually
     # it can contain multiple headers
@@ -138,13 +174,20 @@ def traverse(pointer, iterator, parent=None, allow_bad_mime=False):
         # Delivery notification body can contain all sorts of bad MIME.
         allow_bad_mime = parent and parent.is_delivery_report()
 
-        enclosed = traverse(pointer, iterator, token, allow_bad_mime)
+        first = iterator.position
+        with iterator.skipping(), iterator.nested():
+            enclosed = traverse(pointer, iterator, token, allow_bad_mime)
+
+        def load():
+            forked = iterator.fork(first)
+            return [], traverse(pointer, forked, token, allow_bad_mime)
+
         return make_part(content_type=token if enclosed else default_content_type(),
                      start=pointer,
                      end=iterator.current(),
                      iterator=iterator,
-                     enclosed=enclosed,
-                     parent=parent)
+                     parent=parent,
+                     loader=load if enclosed else None)
 
     # this part contains headers separated by newlines,
     # grab these headers and enclose them in one part
@@ -159,6 +202,24 @@ def traverse(pointer, iterator, parent=None, allow_bad_mime=False):
             parent=parent)
 
 
+def traverse_parts(content_type, iterator):
+    """Traverses the parts of a multipart message up to its final boundary
+    or the end of the message, returns the parts and the ending token."""
+
+    boundary = content_type.get_boundary()
+    parts = deque()
+    while True:
+        token = iterator.current()
+        if token.is_end():
+            break
+        if token == boundary and token.is_final():
+            iterator.next()
+            break
+        with iterator.nested():
+            parts.append(traverse(token, iterator, content_type))
+    return parts, token
+
+
 def grab_headers(pointer, iterator, parent):
     """This function collects all tokens till the boundary
     or the end of the message. Used to scan parts of the message
@@ -191,7 +252,11 @@ def default_content_type():
 
 
 def make_part(content_type, start, end, iterator, parts=[], enclosed=None,
-              parent=None):
+              parent=None, loader=None):
+
+    # the part is being skipped, see TokensIterator.skipping
+    if iterator.skip:
+        return True
 
     # here we detect where the message really starts
     # the exact position in the string, at the end of the
@@ -219,7 +284,7 @@ def make_part(content_type, start, end, iterator, parts=[], enclosed=None,
     # here we find where the enclosed message begins by searching for the
     # first newline
     if parent and (parent.is_message_container() or parent.is_headers_container()):
-        start = locate_first_newline(iterator.stream, start)
+        start = locate_first_newline(iterator.string, start)
 
     # ok, finally, create the MimePart.
     # note that it does not parse anything, just remembers
@@ -229,29 +294,64 @@ def make_part(content_type, start, end, iterator, parts=[], enclosed=None,
             content_type=content_type,
             start=start,
             end=end,
-            stream=iterator.stream,
-            string=iterator.string),
+            string=iterator.string,
+            limits=iterator.limits),
         parts=parts,
         enclosed=enclosed,
-        is_root=(parent==None))
+        is_root=(parent==None),
+        loader=loader)
 
 
-def locate_first_newline(stream, start):
+def locate_first_newline(string, start):
     """We need to locate the first newline"""
-    stream.seek(start)
-    for line in stream:
+    lines = BufferReader(string, start)
+    for line in lines:
         if is_empty(line):
-            return stream.tell()
+            return lines.tell()
 
 
 class TokensIterator(object):
 
-    def __init__(self, tokens, string):
+    def __init__(self, tokens, string, limits=None):
         self.position = -1
         self.tokens = tokens
         self.string = string
-        self.stream = six.StringIO(string)
+        self.limits = limits
         self.opcount = 0
+        self.depth = 0
+        self.skip = False
+        self.checked = False
+
+    def fork(self, position):
+        """Returns a new iterator over the same tokens at the position.
+        Forks are used to build skipped parts, the parts, depth and time
+        limits have been checked while skipping, so forks do not check them
+        again. The parts they build keep the limits for the header loads."""
+        iterator = TokensIterator(self.tokens, self.string, self.limits)
+        iterator.position = position
+        iterator.checked = True
+        return iterator
+
+    @contextmanager
+    def skipping(self):
+        """While skipping, the traversal goes through the tokens as usual
+        but make_part does not build anything."""
+        skip, self.skip = self.skip, True
+        try:
+            yield
+        finally:
+            self.skip = skip
+
+    @contextmanager
+    def nested(self):
+        """Traversal of a nested part."""
+        self.depth += 1
+        try:
+            if self.limits and not self.checked:
+                self.limits.check_depth(self.depth)
+            yield
+        finally:
+            self.depth -= 1
 
     def next(self):
         self.position += 1
@@ -273,10 +373,9 @@ class TokensIterator(object):
         and will raise an exception if things go wrong (too much ops)
         """
         self.opcount += 1
-        if self.opcount > _MAX_OPS:
-            raise DecodingError(
-                "Too many parts: {0}, max is {1}".format(
-                    self.opcount, _MAX_OPS))
+        if self.limits and not self.checked:
+            self.limits.check_parts(self.opcount)
+            self.limits.check_time()
 
 
 class Boundary(object):
@@ -350,8 +449,10 @@ class Start(object):
         return False
 
 
+# The tokenizer runs over the raw message bytes, so that the message does not
+# have to be decoded (and copied) before it is scanned.
 _RE_TOKENIZER = re.compile(
-    r"""
+    br"""
     (?P<ctype>
         # Note that a content type match corresponds to a Content-Type header
         # only when it is located between a boundary and an empty line.
@@ -383,7 +484,6 @@ _RE_TOKENIZER = re.compile(
 _CTYPE = 'ctype'
 _BOUNDARY = 'boundary'
 _END = End()
-_MAX_OPS = 500
 
 
 _SECTION_HEADERS = 'headers'
@@ -395,26 +495,166 @@ _DEFAULT_CONTENT_TYPE = ContentType('text', 'plain', {'charset': 'us-ascii'})
 _EMPTY_LINE = '\r\n'
 
 
-def tokenize(string):
+def tokenize(string, limits=None):
     """
     Scans the entire message to find all Content-Types and boundaries.
     """
-    if six.PY3 and isinstance(string, six.binary_type):
-        string = string.decode('utf-8')
-
-    tokens = deque()
-    for m in _RE_TOKENIZER.finditer(string):
-        if m.group(_CTYPE):
-            name, token = parsing.parse_header(m.group(_CTYPE))
-        elif m.group(_BOUNDARY):
-            token = Boundary(m.group(_BOUNDARY).strip('\t\r\n'),
-                             _grab_newline(m.start(), string, -1),
-                             _grab_newline(m.end(), string, 1))
+    string = _to_buffer(string)
+    limits = (limits or DEFAULT_LIMITS).start()
+
+    tokens = []
+    tokens_filter = _TokensFilter()
+    finder = _BoundaryFinder(string)
+    position = 0
+    headers_start = 0
+    while True:
+        limits.check_time()
+
+        # Only the boundaries can end a body, preamble or epilogue section,
+        # so instead of matching every line there we jump straight to the
+        # lines that start with one of the known boundaries.
+        if tokens_filter.section == _SECTION_HEADERS:
+            m = _RE_TOKENIZER.search(string, position)
         else:
-            token = _EMPTY_LINE
+            position = finder.find(position, tokens_filter.boundaries)
+            if position < 0:
+                break
+            m = _RE_TOKENIZER.match(string, position)
+
+        if not m:
+            break
+
+        if tokens_filter.section == _SECTION_HEADERS:
+            limits.check_header_bytes(m.start() - headers_start)
+
+        position = m.end()
+        token = _make_token(m, string)
+        if tokens_filter.push(token):
+            tokens.append(token)
+            if isinstance(token, Boundary):
+                headers_start = position
+        elif token == _EMPTY_LINE:
+            # either a body or headers of an enclosed message start here
+            headers_start = position
+
+    return tokens
+
+
+class FeedParser(object):
+    """
+    Push parser, the message is fed to it chunk by chunk as it arrives, e.g.
+    from an SMTP DATA stream:
+
+        >>> parser = FeedParser()
+        >>> for chunk in chunks:
+        ...     for event in parser.feed(chunk):
+        ...         if isinstance(event, PartHeaders):
+        ...             route(event.headers)
+        >>> msg = parser.close()
+
+    feed() returns the events that became known with the chunk: PartHeaders
+    when a header section is complete and true Boundary tokens. close()
+    returns the parsed message, the same one scan() would have returned for
+    the concatenated chunks.
+    """
+
+    def __init__(self, limits=None):
+        # only the time spent in feed() and close() counts against the timeout
+        self._limits = (limits or DEFAULT_LIMITS).start()
+        self._limits.pause()
+        self._buf = bytearray()
+        self._pos = 0
+        self._tokens = []
+        self._filter = _TokensFilter()
+        self._headers_start = 0
+        self._closed = False
+
+    def feed(self, chunk):
+        if self._closed:
+            raise DecodingError('Parser is closed')
+
+        with self._limits.running():
+            start = len(self._buf)
+            self._buf.extend(_to_buffer(chunk))
+            # Only complete lines are tokenized, the rest waits for more data.
+            end = self._buf.rfind(b'\n', start) + 1
+            if not end:
+                return []
+            return self._scan(end)
+
+    def close(self):
+        """
+        Scans the remaining data and returns the message tree.
+        """
+        with self._limits.running():
+            if not self._closed:
+                self._scan(len(self._buf), final=True)
+                self._closed = True
+            return _build_tree(self._tokens, bytes(self._buf), self._limits)
+
+    def _scan(self, end, final=False):
+        self._limits.check_time()
+        events = []
+        buf = self._buf
+        for m in _RE_TOKENIZER.finditer(buf, self._pos, end):
+            # A content-type header can be folded, so unless it is followed by
+            # some other line we can not tell whether it is complete yet.
+            if (not final and m.group(_CTYPE) and
+                    buf[m.end():end] in (b'\n', b'\r\n')):
+                self._pos = m.start()
+                return events
+
+            self._pos = m.end()
+            token = _make_token(m, buf)
+            section = self._filter.section
+            if token == _EMPTY_LINE and section == _SECTION_HEADERS:
+                events.append(self._headers_event(m.end()))
+
+            if self._filter.push(token):
+                self._tokens.append(token)
+                if isinstance(token, Boundary):
+                    if not token.final:
+                        self._headers_start = token.end + 1
+                    events.append(token)
+
+        self._pos = max(self._pos, end)
+        return events
+
+    def _headers_event(self, end):
+        start, self._headers_start = self._headers_start, end
+        lines = BufferReader(bytes(self._buf[start:end]))
+        headers = MimeHeaders.from_stream(lines, self._limits)
+        return PartHeaders(start, end, headers)
+
+
+class PartHeaders(object):
+    """
+    Emitted by FeedParser when the header section of a message or of one of
+    its parts is complete. start and end are offsets in the message.
+    """
+
+    def __init__(self, start, end, headers):
+        self.start = start
+        self.end = end
+        self.headers = headers
+
+    def __repr__(self):
+        return 'PartHeaders({}, {}, {})'.format(
+            self.start, self.end, self.headers.get('Content-Type'))
 
-        tokens.append(token)
-    return _filter_false_tokens(tokens)
+
+def _make_token(match, string):
+    # Python 2 returns bytearray groups for a bytearray (FeedParser) buffer.
+    if match.group(_CTYPE):
+        name, token = parsing.parse_header(bytes(match.group(_CTYPE)))
+        return token
+
+    if match.group(_BOUNDARY):
+        return Boundary(_boundary_value(bytes(match.group(_BOUNDARY))),
+                        _grab_newline(match.start(), string, -1),
+                        _grab_newline(match.end(), string, 1))
+
+    return _EMPTY_LINE
 
 
 def _grab_newline(position, string, direction):
@@ -423,82 +663,151 @@ def _grab_newline(position, string, direction):
     this function scans the line to locate these cases.
     """
     while 0 < position < len(string):
-        if string[position] == '\n':
+        if string[position:position + 1] == b'\n':
             if direction < 0:
-                if position - 1 > 0 and string[position-1] == '\r':
+                if position - 1 > 0 and string[position-1:position] == b'\r':
                     return position - 1
             return position
         position += direction
     return position
 
 
-def _filter_false_tokens(tokens):
+def _to_buffer(string):
+    """
+    The scanner works with the raw message bytes. On Python 3 unicode input
+    is encoded to UTF-8, binary input and memory mapped files are used as is
+    without copying.
+    """
+    if isinstance(string, (six.binary_type, mmap.mmap)):
+        return string
+
+    if six.PY3 and isinstance(string, six.text_type):
+        return string.encode('utf-8')
+
+    raise DecodingError('Scanner works with binary only')
+
+
+def _boundary_value(line):
+    value = line.strip(b'\t\r\n')
+    if six.PY3:
+        value = value.decode('utf-8', 'replace')
+    return value
+
+
+class _BoundaryFinder(object):
     """
-    Traverses a list of pre-scanned tokens and removes false content-type
-    and boundary tokens.
+    Finds lines that start with one of the given boundaries. The next
+    occurrence of every boundary is remembered, so the message is searched
+    for each boundary only once.
+    """
+
+    def __init__(self, string):
+        self.string = string
+        self.found = {}
 
-    A content-type header is false unless it it the first content-type header
+    def find(self, position, boundaries):
+        """
+        Returns the position of the first line at or after the position that
+        starts with a boundary delimiter, or -1 if there is none.
+        """
+        first = -1
+        for boundary in boundaries:
+            if boundary is None:
+                continue
+
+            found = self.found.get(boundary)
+            if found is None or 0 <= found < position:
+                found = self._find(_delimiter(boundary), position)
+                self.found[boundary] = found
+
+            if found >= 0 and (first < 0 or found < first):
+                first = found
+        return first
+
+    def _find(self, delimiter, position):
+        if position == 0 and self.string[:len(delimiter)] == delimiter:
+            return 0
+
+        found = self.string.find(b'\n' + delimiter, max(position - 1, 0))
+        return found + 1 if found >= 0 else -1
+
+
+def _delimiter(boundary):
+    if isinstance(boundary, six.text_type):
+        boundary = boundary.encode('utf-8')
+    return b'--' + boundary
+
+
+class _TokensFilter(object):
+    """
+    State machine that tells true content-type and boundary tokens from
+    false ones, one pre-scanned token at a time. Empty line tokens are never
+    true, they just mark where a header section ends.
+
+    A content-type header is false unless it is the first content-type header
     in a message/part headers section.
 
     A boundary token is false if it has not been mentioned in a preceding
     content-type header.
     """
-    current_section = _SECTION_HEADERS
-    current_content_type = None
-    filtered = []
-    boundaries = []
-    for token in tokens:
+
+    def __init__(self):
+        self.section = _SECTION_HEADERS
+        self.content_type = None
+        self.boundaries = []
+
+    def push(self, token):
+        """
+        Returns True if the token is a true content-type or boundary token.
+        """
         if isinstance(token, ContentType):
             # Only the first content-type header in a headers section is valid.
-            if current_content_type or current_section != _SECTION_HEADERS:
-                continue
-    
-            current_content_type = token
-            boundaries.append(token.get_boundary())
+            if self.content_type or self.section != _SECTION_HEADERS:
+                return False
+
+            self.content_type = token
+            self.boundaries.append(token.get_boundary())
+            return True
 
         elif isinstance(token, Boundary):
             value = token.value[2:]
 
-            if value in boundaries:
+            if value in self.boundaries:
                 token.value = value
                 token.final = False
-                current_section = _SECTION_HEADERS
-                current_content_type = None
+                self.section = _SECTION_HEADERS
+                self.content_type = None
+                return True
 
-            elif _strip_endings(value) in boundaries:
+            elif _strip_endings(value) in self.boundaries:
                 token.value = _strip_endings(value)
                 token.final = True
-                current_section = _SECTION_MULTIPART_EPILOGUE
+                self.section = _SECTION_MULTIPART_EPILOGUE
+                return True
 
-            else:
-                # False boundary detected!
-                continue
+            # False boundary detected!
+            return False
 
         elif token == _EMPTY_LINE:
-            if current_section == _SECTION_HEADERS:
-                if not current_content_type:
-                    current_content_type = _DEFAULT_CONTENT_TYPE
-
-                if current_content_type.is_singlepart():
-                    current_section = _SECTION_BODY
-                elif current_content_type.is_multipart():
-                    current_section = _SECTION_MULTIPART_PREAMBLE
+            if self.section == _SECTION_HEADERS:
+                if not self.content_type:
+                    self.content_type = _DEFAULT_CONTENT_TYPE
+
+                if self.content_type.is_singlepart():
+                    self.section = _SECTION_BODY
+                elif self.content_type.is_multipart():
+                    self.section = _SECTION_MULTIPART_PREAMBLE
                 else:
                     # Start of an enclosed message or just its headers.
-                    current_section = _SECTION_HEADERS
-                    current_content_type = None
+                    self.section = _SECTION_HEADERS
+                    self.content_type = None
 
             # Cast away empty line tokens, for they have been pre-scanned just
             # to identify a place where a header section completes and a body
             # section starts.
-            continue
-
-        else:
-            raise DecodingError('Unknown token')
-
-        filtered.append(token)
+            return False
 
-    return filtered
+        raise DecodingError('Unknown token')
 
 
 def _strip_endings(value):
@@ -0,0 +1,181 @@
+"""
+Extracts a fixed set of facts from a message in one pass, only the headers
+and the parts needed for the requested fields are decoded.
+
+    >>> from flanker import mime
+    >>> mime.summarize(message_string, fields=('message_id', 'subject'))
+    {'message_id': u'4FEEF9B3.7060508@example.net', 'subject': u'Wow'}
+
+Fields:
+
+    * message_id - Message-Id without angle brackets, or None.
+    * from, to, cc - lists of (display name, address) tuples.
+    * subject - the subject or u''.
+    * date - the Date header as a UTC timestamp, or None.
+    * text, html - the first text/plain and text/html bodies that are not
+      attachments, or None.
+    * attachments - list of (file name, content type, size) tuples, parts
+      of attached messages are not listed. The size is the length of the
+      decoded body, in characters for text, or the size of the attached
+      message.
+    * headers - dict of the top level headers, the first value of every
+      header. Values of parametrized headers are (value, params) tuples.
+
+When only header fields are requested the message body is not scanned.
+Unknown fields raise ValueError.
+"""
+from email.utils import mktime_tz, parsedate_tz
+
+from flanker.mime.create import from_string
+from flanker.mime.message.headers import MessageId
+
+FIELDS = ('message_id', 'from', 'to', 'cc', 'subject', 'date', 'text',
+          'html', 'attachments')
+_HEADER_FIELDS = frozenset(
+    ['message_id', 'from', 'to', 'cc', 'subject', 'date', 'headers'])
+
+
+def summarize(string, fields=FIELDS):
+    """Parses a message and returns a dict with the requested fields."""
+    _check_fields(fields)
+    headers_only = _HEADER_FIELDS.issuperset(fields)
+    return summarize_message(from_string(string, headers_only), fields)
+
+
+def summarize_message(message, fields=FIELDS):
+    """Returns a dict with the requested fields of a parsed message."""
+    _check_fields(fields)
+    summary = {}
+    for field in fields:
+        if field in _HEADER_FIELDS:
+            summary[field] = _HEADER_EXTRACTORS[field](message.headers)
+
+    if 'text' in fields or 'html' in fields or 'attachments' in fields:
+        summary.update(_summarize_parts(message, fields))
+
+    return summary
+
+
+def empty_summary(fields=FIELDS):
+    """Returns a dict with the requested fields of a message that has none of
+    them, e.g. in place of the summary of a message that failed to parse."""
+    _check_fields(fields)
+    return dict((field, _EMPTY_VALUES[field]()) for field in fields)
+
+
+def _check_fields(fields):
+    unknown = set(fields) - _HEADER_FIELDS - set(FIELDS)
+    if unknown:
+        raise ValueError('unknown fields: %s' % ', '.join(sorted(unknown)))
+
+
+def _summarize_parts(message, fields):
+    want_text = 'text' in fields
+    want_html = 'html' in fields
+    want_attachments = 'attachments' in fields
+    text = html = None
+    attachments = []
+    # depth first like walk(), attached messages are attachments, their
+    # parts are not looked into
+    stack = [message]
+    while stack:
+        part = stack.pop()
+        ctype = part.content_type
+        if ctype.is_multipart():
+            stack.extend(reversed(part.parts))
+            continue
+
+        is_text = want_text and text is None and ctype == 'text/plain'
+        is_html = want_html and html is None and ctype == 'text/html'
+        if not (want_attachments or is_text or is_html):
+            # the headers of the part are not even loaded
+            continue
+
+        file_name = part.detected_file_name
+        if part.is_attachment() or file_name:
+            attachments.append(
+                (file_name, str(ctype), _attachment_size(part)))
+        elif is_text:
+            text = part.body
+        elif is_html:
+            html = part.body
+
+        if not (want_attachments or
+                want_text and text is None or
+                want_html and html is None):
+            break
+
+    summary = {}
+    if 'text' in fields:
+        summary['text'] = text
+    if 'html' in fields:
+        summary['html'] = html
+    if 'attachments' in fields:
+        summary['attachments'] = attachments
+    return summary
+
+
+def _attachment_size(part):
+    if part.content_type.is_message_container():
+        return part.enclosed.size
+    # the body is decoded in chunks, it is not kept in memory
+    return sum(len(chunk) for chunk in part.iter_body())
+
+
+def _message_id(headers):
+    message_id = MessageId.from_string(headers.get('Message-Id', ''))
+    return message_id or None
+
+
+def _addresses(name):
+    def extract(headers):
+        value = headers.get(name)
+        if not value:
+            return []
+
+        # imported here, addresslib depends on flanker.mime
+        from flanker.addresslib.address import parse_list
+        return [(getattr(a, 'display_name', u''), a.address)
+                for a in parse_list(value)]
+    return extract
+
+
+def _date(headers):
+    value = headers.get('Date')
+    parsed = value and parsedate_tz(value)
+    if not parsed:
+        return None
+    return mktime_tz(parsed)
+
+
+def _headers(headers):
+    collected = {}
+    for name, value in headers.iteritems():
+        if isinstance(value, tuple):
+            value = tuple(value)
+        collected.setdefault(name, value)
+    return collected
+
+
+_HEADER_EXTRACTORS = {
+    'message_id': _message_id,
+    'from': _addresses('From'),
+    'to': _addresses('To'),
+    'cc': _addresses('Cc'),
+    'subject': lambda headers: headers.get('Subject', u''),
+    'date': _date,
+    'headers': _headers,
+}
+
+_EMPTY_VALUES = {
+    'message_id': lambda: None,
+    'from': list,
+    'to': list,
+    'cc': list,
+    'subject': lambda: u'',
+    'date': lambda: None,
+    'text': lambda: None,
+    'html': lambda: None,
+    'attachments': list,
+    'headers': dict,
+}
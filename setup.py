@@ -28,8 +28,7 @@ setup(name='flanker',
           'ply>=3.10',
           'regex>=0.1.20110315',
           'six',
-          'tld',
-          'WebOb>=0.9.8'],
+          'tld'],
       extras_require={
           'validator': [
               'dnsq>=1.1.6',
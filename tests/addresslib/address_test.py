@@ -746,3 +746,21 @@ def test_parse_list_relaxed():
 def _typed_eq(lhs, rhs):
     eq_(lhs, rhs)
     eq_(type(lhs), type(rhs))
+
+
+def test_canonical_key():
+    eq_(u'bobsilva@gmail.com',
+        parse('Bob.Silva+news@googlemail.com').canonical_key())
+    eq_(u'bob.silva@yahoo.com',
+        parse('Bob.Silva-shopping@yahoo.com').canonical_key())
+    eq_(u'bob.silva@hotmail.com',
+        parse('bob.silva+tag@Hotmail.com').canonical_key())
+    eq_(u'bob@icloud.com', parse('Bob+tag@me.com').canonical_key())
+    eq_(u'bob.silva+tag@host.com',
+        parse('Bob.Silva+tag@host.com').canonical_key())
+
+
+def test_canonical_key_plugin():
+    from flanker.addresslib.plugins import google
+    eq_(u'bob.silva@host.com',
+        parse('Bob.Silva+tag@host.com').canonical_key(plugin=google))
@@ -0,0 +1,52 @@
+# coding:utf-8
+from nose.tools import eq_
+
+from flanker.addresslib import dedupe
+from flanker.addresslib.address import parse
+
+
+ADDRESSES = [
+    'bob.silva@gmail.com',
+    'alice@host.com',
+    'BobSilva+news@googlemail.com',
+    'not an address',
+    'Alice <ALICE@host.com>',
+    'bob-shop@yahoo.com',
+    'bob@yahoo.com',
+]
+
+
+def test_group_by_canonical_key():
+    groups = dict(dedupe.group_by_canonical_key(ADDRESSES))
+    eq_({u'bobsilva@gmail.com': [u'bob.silva@gmail.com',
+                                 u'BobSilva+news@googlemail.com'],
+         u'alice@host.com': [u'alice@host.com', u'Alice <ALICE@host.com>'],
+         u'bob@yahoo.com': [u'bob-shop@yahoo.com', u'bob@yahoo.com']},
+        groups)
+
+
+def test_group_by_canonical_key_spills():
+    addresses = ['user{0}+{1}@gmail.com'.format(i % 50, i)
+                 for i in range(1000)]
+    with dedupe.DedupeIndex(buckets=4, max_buffered=10) as index:
+        index.update(addresses)
+        eq_(1000, len(index))
+        groups = dict(index.groups())
+
+    eq_(50, len(groups))
+    eq_(['user7+{0}@gmail.com'.format(i) for i in range(7, 1000, 50)],
+        groups[u'user7@gmail.com'])
+
+
+def test_unique():
+    eq_(set([u'bob.silva@gmail.com', u'alice@host.com',
+             u'bob-shop@yahoo.com']),
+        set(dedupe.unique(ADDRESSES)))
+
+
+def test_add_email_address():
+    index = dedupe.DedupeIndex()
+    eq_(u'bobsilva@gmail.com', index.add(parse('Bob <b.o.b.silva@gmail.com>')))
+    eq_(None, index.add('http://host.com'))
+    eq_([(u'bobsilva@gmail.com', [u'Bob <b.o.b.silva@gmail.com>'])],
+        list(index.groups()))
@@ -0,0 +1,121 @@
+# coding:utf-8
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from nose.tools import eq_, ok_
+
+from flanker.mime import bulk, create
+from tests import ENCLOSED, ATTACHED_PDF, TEXT_ONLY
+
+_BROKEN = b'Content-Type: multipart/mixed\n\nHello\n'
+_FROM_LINE = b'From bob@example.com Sat Jan  3 01:05:34 1996\n'
+_MESSAGES = [ENCLOSED, ATTACHED_PDF, _BROKEN, TEXT_ONLY]
+
+
+def iter_mbox_test():
+    with _temp_dir() as tmpdir:
+        sources = list(bulk.iter_mbox(_write_mbox(tmpdir)))
+        eq_([m + b'\n' for m in _MESSAGES], [s.read() for s in sources])
+
+
+def iter_mbox_without_from_line_test():
+    with _temp_dir() as tmpdir:
+        path = os.path.join(tmpdir, 'mbox')
+        with open(path, 'wb') as f:
+            f.write(TEXT_ONLY + b'\n' + _FROM_LINE + ENCLOSED)
+        eq_([TEXT_ONLY + b'\n', ENCLOSED],
+            [s.read() for s in bulk.iter_mbox(path)])
+
+
+def iter_maildir_test():
+    with _temp_dir() as tmpdir:
+        sources = list(bulk.iter_maildir(_write_maildir(tmpdir)))
+        eq_(_MESSAGES, [s.read() for s in sources])
+
+
+def parse_mbox_test():
+    with _temp_dir() as tmpdir:
+        path = _write_mbox(tmpdir)
+        summaries = list(bulk.parse_mbox(path, processes=2, chunksize=1))
+        eq_(summaries, list(bulk.parse_mbox(path, processes=1)))
+    eq_(4, len(summaries))
+
+    eq_(u'<4FEEF9B3.7060508@example.net>',
+        summaries[0]['headers']['Message-Id'])
+    eq_('multipart/mixed', summaries[0]['headers']['Content-Type'][0])
+    eq_([(u'thanks.eml', 'message/rfc822', 2504)],
+        summaries[0]['attachments'])
+    eq_(None, summaries[0]['error'])
+    eq_(len(ENCLOSED) + 1, summaries[0]['size'])
+
+    eq_([u'test.pdf'], [a[0] for a in summaries[1]['attachments']])
+
+    ok_(summaries[2]['error'])
+    eq_({}, summaries[2]['headers'])
+
+    eq_([], summaries[3]['attachments'])
+
+
+def parse_maildir_test():
+    with _temp_dir() as tmpdir:
+        summaries = list(bulk.parse_maildir(_write_maildir(tmpdir)))
+        eq_(4, len(summaries))
+        eq_(u'Thanks!', create.from_string(
+            summaries[0]['source'].read()).parts[1].enclosed.subject)
+
+
+def parse_fields_test():
+    with _temp_dir() as tmpdir:
+        summaries = list(bulk.parse_mbox(_write_mbox(tmpdir), processes=1,
+                                         fields=('subject', 'text')))
+    eq_(u'Wow', summaries[0]['subject'])
+    eq_(u'Hello\r\n', summaries[0]['text'])
+    eq_({'subject': u'', 'text': None},
+        dict((k, summaries[2][k]) for k in ('subject', 'text')))
+    ok_('headers' not in summaries[2])
+    ok_(summaries[2]['error'])
+
+
+def parse_missing_message_test():
+    # a message moved away from the maildir after it was listed
+    with _temp_dir() as tmpdir:
+        sources = list(bulk.iter_maildir(_write_maildir(tmpdir)))
+        os.remove(sources[1].path)
+        summaries = list(bulk.parse(sources, processes=2, chunksize=1))
+    eq_(4, len(summaries))
+    eq_(None, summaries[0]['error'])
+    ok_(summaries[1]['error'])
+    eq_({}, summaries[1]['headers'])
+    eq_([], summaries[1]['attachments'])
+    eq_(None, summaries[1]['size'])
+    eq_(None, summaries[3]['error'])
+
+
+@contextmanager
+def _temp_dir():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        yield tmpdir
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def _write_mbox(tmpdir):
+    path = os.path.join(tmpdir, 'mbox')
+    with open(path, 'wb') as f:
+        for message in _MESSAGES:
+            f.write(_FROM_LINE + message + b'\n')
+    return path
+
+
+def _write_maildir(tmpdir):
+    for subdir in ('cur', 'new', 'tmp'):
+        os.mkdir(os.path.join(tmpdir, subdir))
+    for i, message in enumerate(_MESSAGES):
+        subdir = 'new' if i < 2 else 'cur'
+        name = '%d.localhost:2,S' % i
+        with open(os.path.join(tmpdir, subdir, name), 'wb') as f:
+            f.write(message)
+    return tmpdir
@@ -0,0 +1,183 @@
+# coding:utf-8
+"""Streaming body decoding and encoding, these tests run on Python 3 too."""
+import quopri
+from contextlib import closing
+
+import six
+from mock import patch
+from nose.tools import eq_, ok_, assert_raises
+
+from flanker.mime.create import text
+from flanker.mime.message.errors import DecodingError
+from flanker.mime.message.scanner import scan
+from flanker.mime.message.part import (encode_transfer_encoding, BufferReader,
+                                       encode_body, decode_transfer_encoding,
+                                       iter_encode_body,
+                                       iter_encode_transfer_encoding,
+                                       iter_decode_transfer_encoding)
+from tests import (ENCLOSED, TORTURE, ENCLOSED_BROKEN_BODY, QUOTED_PRINTABLE,
+                   RUSSIAN_ATTACH_YAHOO, MAILGUN_PIC, MAILGUN_PNG, TEXT_ONLY)
+
+
+def buffer_reader_test():
+    lines = BufferReader(b"a\r\nb\nc", 3)
+    eq_(b"b\n", next(lines))
+    eq_(5, lines.tell())
+    eq_([b"c"], list(lines))
+    lines.seek(0)
+    eq_(b"a\r\n", lines.readline())
+
+
+def iter_body_test():
+    for message in (ENCLOSED, ENCLOSED_BROKEN_BODY, QUOTED_PRINTABLE,
+                    RUSSIAN_ATTACH_YAHOO, MAILGUN_PIC, TORTURE):
+        bodies = [p.body for p in scan(message).walk(with_self=True)]
+        for chunk_size in (7, 4096):
+            for part, body in zip(scan(message).walk(with_self=True), bodies):
+                chunks = list(part.iter_body(chunk_size))
+                if body is None:
+                    eq_([], chunks)
+                else:
+                    eq_(body, type(body)().join(chunks))
+
+
+def iter_body_changed_test():
+    message = scan(ENCLOSED)
+    message.parts[0].body = u'Hello, world!'
+    eq_([u'Hello', u', wor', u'ld!'], list(message.parts[0].iter_body(5)))
+    eq_([u'Hi'], list(text('plain', u'Hi').iter_body()))
+    eq_([], list(message.iter_body()))
+
+
+def iter_body_charset_test():
+    # the text does not decode with its charset, it is guessed like for body
+    body = u'Привет, как дела? Это тестовое сообщение.\r\n' * 20
+    for charset in (b'us-ascii', b'utf-8'):
+        part = scan(b'Content-Type: text/plain; charset=' + charset + b'\r\n'
+                    b'Content-Transfer-Encoding: 8bit\r\n\r\n' +
+                    body.encode('cp1251'))
+        eq_(body, u''.join(part.iter_body(100)))
+        eq_(body, part.body)
+
+    # neither can guess the charset of binary junk
+    junk = bytes(bytearray((i * i * 31 + i * 7) % 256 for i in range(1000)))
+    part = scan(b'Content-Type: text/plain\r\n\r\n' + junk)
+    assert_raises(DecodingError, part.iter_body)
+    assert_raises(DecodingError, getattr, part, 'body')
+
+
+def body_to_file_test():
+    part = scan(MAILGUN_PIC).parts[1]
+    with closing(six.BytesIO()) as out:
+        part.body_to_file(out, chunk_size=100)
+        eq_(MAILGUN_PNG, out.getvalue())
+
+
+def iter_encode_body_test():
+    bodies = [u'', u'Hello', u'a' * 700 + u'\r\nb \t\n', u'x\r\ny\nz \n' * 50,
+              u'Привет мир ☯ ' * 30, u' line ' * 200, u'.\nFrom me\n=\t\n' * 9]
+    for body in bodies:
+        part = scan(TEXT_ONLY)
+        part.body = body
+        expected = encode_body(part)
+        for chunk_size in (5, 4096):
+            charset, encoding, chunks = iter_encode_body(part, chunk_size)
+            eq_(expected, (charset, encoding, b''.join(chunks)))
+
+    part = scan(MAILGUN_PIC).parts[1]
+    part.body = MAILGUN_PNG + b'\n'
+    expected = encode_body(part)
+    charset, encoding, chunks = iter_encode_body(part, 100)
+    eq_(expected, (charset, encoding, b''.join(chunks)))
+
+
+def to_stream_changed_test():
+    message = scan(MAILGUN_PIC)
+    message.parts[0].body = u'Hello,\r\n' + u'world! ' * 100
+    expected = message.to_string()
+
+    message = scan(MAILGUN_PIC)
+    message.parts[0].body = u'Hello,\r\n' + u'world! ' * 100
+    with patch('flanker.mime.message.part._CHUNK_SIZE', 10):
+        with closing(six.StringIO()) as out:
+            message.to_stream(out)
+            eq_(expected, out.getvalue())
+
+
+def to_stream_headers_changed_test():
+    message = scan(MAILGUN_PIC)
+    message.parts[1].headers['X-Attachment-Id'] = u'changed'
+    expected = message.to_string()
+
+    # the unchanged body is written in slices, not read as a whole
+    writes = []
+
+    class Out(six.StringIO):
+        def write(self, s):
+            writes.append(len(s))
+            six.StringIO.write(self, s)
+
+    message = scan(MAILGUN_PIC)
+    message.parts[1].headers['X-Attachment-Id'] = u'changed'
+    with patch('flanker.mime.message.part._CHUNK_SIZE', 100):
+        with closing(Out()) as out:
+            message.to_stream(out)
+            eq_(expected, out.getvalue())
+    ok_(len(MAILGUN_PNG) > 10000)
+    ok_(max(writes) < 1000)
+
+
+def quoted_printable_test():
+    for message in (QUOTED_PRINTABLE, TORTURE):
+        for p in scan(message).walk(with_self=True):
+            if p.content_encoding.value != 'quoted-printable':
+                continue
+            raw = p._container.read_body()
+            body = decode_transfer_encoding('quoted-printable', raw)
+            eq_(quopri.decodestring(raw), body)
+
+            encoded = encode_transfer_encoding('quoted-printable', body)
+            eq_(quopri.encodestring(body, quotetabs=False), encoded)
+            eq_(body, decode_transfer_encoding('quoted-printable', encoded))
+
+    # tabs are not quoted, trailing whitespace is
+    eq_(b'a\tb=20\n=09\n',
+        encode_transfer_encoding('quoted-printable', b'a\tb \n\t\n'))
+
+
+def quoted_printable_long_line_test():
+    # a multi-MB single line, only a char or two wait for the next chunk
+    part = scan(TEXT_ONLY)
+    part.body = u'<p style="color: red">Hello,\t=world. </p>' * 60000
+    charset, encoding, body = encode_body(part)
+    eq_('quoted-printable', encoding)
+    with patch('flanker.mime.message.part._CHUNK_SIZE', 64):
+        with closing(six.StringIO()) as out:
+            part.to_stream(out)
+            ok_(out.getvalue().endswith(body.decode('ascii')))
+
+    # the soft line breaks end like the first line, it ends late here
+    body = b'x. \t' * 500000 + b'\r\nend \r\n'
+    chunks = (body[i:i + 64] for i in range(0, len(body), 64))
+    eq_(encode_transfer_encoding('quoted-printable', body),
+        b''.join(iter_encode_transfer_encoding('quoted-printable', chunks)))
+
+
+def quoted_printable_decode_long_line_test():
+    # malformed quoted-printable without line breaks, a few MB of it
+    for body in (b'caf=C3=A9 =3D ==3D=' * 250000,
+                 b'a=4' * 1000 + b'=\r' + b'dropped=' * 500000 + b'\nend='):
+        chunks = (body[i:i + 64] for i in range(0, len(body), 64))
+        eq_(decode_transfer_encoding('quoted-printable', body),
+            b''.join(iter_decode_transfer_encoding('quoted-printable', chunks)))
+
+
+def base64_decode_padding_test():
+    # the first padding that completes a group ends the data
+    for body in (b'QQ==QUI=', b'QUI=QQ==', b'QUJD\r\nQQ=\r\n=QUJD',
+                 b'Q=Q=QUJD', b'QQ=QUJD', b'QUJDQQ='):
+        for size in (1, 3, 64):
+            chunks = (body[i:i + size] for i in range(0, len(body), size))
+            eq_(decode_transfer_encoding('base64', body),
+                b''.join(iter_decode_transfer_encoding('base64', chunks)))
+    eq_(b'A', b''.join(iter_decode_transfer_encoding('base64', [b'QQ==QUI='])))
@@ -363,3 +363,60 @@ def create_newlines_in_headers_test():
     text = create.from_string(text.to_string())
     eq_('Hello,newline', text.headers['Subject'])
     eq_(u'Превед, медвед!', text.headers['To'])
+
+
+def from_file_test():
+    path = fixture_file('messages/enclosed.eml')
+    for source in (path, open(path, 'rb')):
+        message = create.from_file(source)
+        eq_(u'"Александр Клижентас☯" <bob@example.com>',
+            message.headers['To'])
+        eq_(create.from_string(ENCLOSED).to_string(), message.to_string())
+        eq_(create.from_string(ENCLOSED).parts[1].enclosed.parts[1].body,
+            message.parts[1].enclosed.parts[1].body)
+
+
+def from_file_changed_test():
+    with open(fixture_file('messages/enclosed.eml'), 'rb') as f:
+        message = create.from_file(f.fileno())
+        message.parts[0].body = u'Hello'
+        message = create.from_string(message.to_string())
+        eq_(u'Hello', message.parts[0].body)
+        eq_(2, len(message.parts))
+
+
+def from_string_headers_only_test():
+    message = create.from_string(ENCLOSED, headers_only=True)
+    eq_('<4FEEF9B3.7060508@example.net>', message.headers['Message-Id'])
+    eq_('multipart/mixed', message.content_type)
+    ok_(message._loader is not None)
+    eq_(ENCLOSED.decode('utf-8'), message.to_string())
+
+    # the rest of the message is scanned once the parts are touched
+    eq_(2, len(message.parts))
+    ok_(message._loader is None)
+    eq_(u'Thanks!', message.parts[1].enclosed.headers['Subject'])
+
+    message.parts[0].body = u'Hello'
+    message = create.from_string(message.to_string())
+    eq_(u'Hello', message.parts[0].body)
+    eq_(2, len(message.parts))
+
+
+def from_string_headers_only_singlepart_test():
+    message = create.from_string(TEXT_ONLY, headers_only=True)
+    eq_(create.from_string(TEXT_ONLY).body, message.body)
+    eq_([], message.parts)
+
+
+def from_string_headers_only_malformed_test():
+    message = create.from_string(
+        b'Content-Type: multipart/mixed\r\n\r\nHello', headers_only=True)
+    eq_('multipart/mixed', message.content_type)
+    assert_raises(errors.DecodingError, lambda: message.parts)
+
+
+def headers_from_string_test():
+    headers = create.headers_from_string(ENCLOSED)
+    eq_('<4FEEF9B3.7060508@example.net>', headers['Message-Id'])
+    eq_(create.from_string(ENCLOSED).headers.items(), headers.items())
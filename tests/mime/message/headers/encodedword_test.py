@@ -132,6 +132,15 @@ def various_encodings_test():
     eq_(u'Evaneos-Concepción.pdf', encodedword.mime_to_unicode(v))
 
 
+def decode_quoted_printable_test():
+    eq_(b'caf\xc3\xa9 au lait', encodedword._decode_quoted_printable(
+        u'caf=C3=a9_au_lait'))
+    # "=" that do not start an escape are kept as is
+    for value in (u'=', u'100=', u'a=zzb', u'==41', u'=4', u'=\r\n', u'=_'):
+        eq_(value.replace(u'_', u' ').replace(u'=41', u'A').encode('ascii'),
+            encodedword._decode_quoted_printable(value))
+
+
 @patch.object(utils, '_guess_and_convert', Mock(side_effect=errors.EncodingError()))
 def test_convert_to_utf8_unknown_encoding():
     eq_(u"abc\u20acdef",
@@ -147,3 +156,49 @@ def test_convert_to_utf8_unknown_encoding():
 @patch.object(encodedword, 'unfold', Mock(side_effect=Exception))
 def test_error_reporting():
     eq_("Sasha", encodedword.mime_to_unicode("Sasha"))
+
+
+def test_decode_cache():
+    subject = '=?utf-8?B?0JfQtdC80LvRj9C60Lg=?='
+    encodedword.enable_decode_cache(max_size=2)
+    try:
+        eq_(u'Земляки', encodedword.mime_to_unicode(subject))
+        with patch.object(encodedword, '_mime_to_unicode') as decode:
+            eq_(u'Земляки', encodedword.mime_to_unicode(subject))
+            ok_(not decode.called)
+        eq_(encodedword.DecodeCacheInfo(1, 1, 2, 1),
+            encodedword.decode_cache_info(reset=True))
+        eq_((0, 0), (encodedword.decode_cache_info().hits,
+                     encodedword.decode_cache_info().misses))
+
+        for i in range(10):
+            eq_(u'subject %d' % i,
+                encodedword.mime_to_unicode('subject %d' % i))
+            ok_(len(encodedword._cache) <= 2)
+    finally:
+        encodedword.disable_decode_cache()
+
+    eq_(u'Земляки', encodedword.mime_to_unicode(subject))
+    eq_(10, encodedword.decode_cache_info().misses)
+    eq_(0, encodedword.decode_cache_info().size)
+
+
+def test_report_decode_cache_metrics():
+    encodedword.enable_decode_cache()
+    try:
+        for subject in ('a', 'b', 'a', 'a'):
+            encodedword.mime_to_unicode(subject)
+        with patch.object(encodedword, 'metrics') as metrics:
+            encodedword.report_decode_cache_metrics()
+            eq_([call.incr('encodedword.cache.hit', 2),
+                 call.incr('encodedword.cache.miss', 2)],
+                metrics.mock_calls)
+
+            # the reported lookups are not reported again
+            metrics.reset_mock()
+            encodedword.report_decode_cache_metrics()
+            eq_([call.incr('encodedword.cache.hit', 0),
+                 call.incr('encodedword.cache.miss', 0)],
+                metrics.mock_calls)
+    finally:
+        encodedword.disable_decode_cache()
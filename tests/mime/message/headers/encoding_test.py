@@ -97,3 +97,19 @@ def add_header_preserve_original_encoding_test():
 
     # check original encoded header is still in the mime string
     ok_(original_from in message.to_string())
+
+
+def encode_unstructured_unfolded_test():
+    for name, value in [
+            ('Subject', 'Re: quarterly report, draft 2'),
+            ('Subject', 'trailing space '),
+            ('Subject', ' leading space'),
+            ('Subject', 'tab\tand  two spaces'),
+            ('Subject', 'x' * (75 - len('Subject: '))),
+            ('Subject', 'x' * (76 - len('Subject: '))),
+            ('Subject', 'a ' * 40),
+            ('X-Mailer', 'line\r\n break'),
+            ('X-Mailer', 'vertical\x0btab')]:
+        eq_(Header(value.encode('ascii'), 'ascii',
+                   header_name=name).encode(splitchars=' ;,'),
+            _encode_unstructured(name, value))
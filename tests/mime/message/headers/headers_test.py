@@ -1,12 +1,14 @@
 # coding:utf-8
+import types
 import zlib
 
 import six
+from mock import Mock, patch
 from nose.tools import eq_, ok_, assert_false, assert_raises
 
 from flanker.mime.message.errors import DecodingError
 from flanker.mime.message.headers import MimeHeaders
-from flanker.mime.message.headers import encoding
+from flanker.mime.message.headers import encoding, encodedword, parsing
 from tests import BILINGUAL
 
 
@@ -128,6 +130,64 @@ def headers_transform_encodedword_test():
     h.transform(lambda key,val: (key, val.replace(u'✓', u'☃')), decode=True)
     eq_(u'Hello ☃', h.get('Subject'))
 
+def headers_decoded_once_test():
+    subject = '=?utf-8?q?Hello_=E2=9C=93?='
+    h = MimeHeaders([('Subject', subject), ('Received', '1')])
+    with patch.object(encodedword, 'decode',
+                      Mock(side_effect=encodedword.mime_to_unicode)) as decode:
+        for _ in range(3):
+            eq_(u'Hello \u2713', h['Subject'])
+            eq_(u'Hello \u2713', h.get('subject'))
+            eq_([u'Hello \u2713'], h.getall('Subject'))
+        eq_(1, decode.call_count)
+
+        items = h.iteritems()
+        ok_(isinstance(items, types.GeneratorType))
+        eq_([('Subject', u'Hello \u2713'), ('Received', u'1')], list(items))
+        eq_(2, decode.call_count)
+
+        h['Subject'] = u'Bye'
+        eq_(u'Bye', h['Subject'])
+        eq_(3, decode.call_count)
+
+
+def headers_changed_while_iterating_test():
+    h = MimeHeaders([('Subject', '=?utf-8?q?Hello?='), ('X-Spam', 'yes'),
+                     ('Received', '1')])
+    for key, value in h.iteritems():
+        if key.startswith('X-'):
+            del h[key]
+        h.prepend('X-Seen', key)
+    eq_([('X-Seen', u'Received'), ('X-Seen', u'X-Spam'),
+         ('X-Seen', u'Subject'), ('Subject', u'Hello'), ('Received', u'1')],
+        h.items())
+
+    for key, value in h.iteritems(raw=True):
+        h[key] = value
+    eq_([('X-Seen', u'Subject'), ('Subject', u'Hello'), ('Received', u'1')],
+        h.items())
+
+
+def headers_parsed_lazily_test():
+    stream = six.StringIO('Subject: =?utf-8?q?Hello?=\r\n'
+                          'Received: from a\r\n by b\r\n'
+                          'Content-Type: text/plain; charset=utf-8\r\n')
+    with patch.object(parsing, 'parse_header_value',
+                      Mock(side_effect=parsing.parse_header_value)) as parse:
+        h = MimeHeaders.from_stream(stream)
+        # content headers are parsed right away
+        eq_(1, parse.call_count)
+        eq_(u'Hello', h['Subject'])
+        eq_(u'Hello', h['Subject'])
+        eq_(2, parse.call_count)
+        eq_('from a by b', h.getraw('Received'))
+        eq_(3, parse.call_count)
+
+    eq_(('text/plain', {'charset': 'utf-8'}), h['Content-Type'])
+    eq_([('Subject', u'Hello'), ('Received', 'from a by b'),
+         ('Content-Type', ('text/plain', {'charset': 'utf-8'}))], h.items())
+
+
 def headers_parsing_empty_test():
     h = MimeHeaders.from_stream(six.StringIO(""))
     eq_(0, len(h))
@@ -0,0 +1,47 @@
+from nose.tools import eq_, ok_, assert_false, assert_raises
+
+from flanker.mime.message.headers.multidict import MultiDict
+
+
+def multidict_test():
+    d = MultiDict([('Received', 1), ('Subject', 2), ('Received', 3)])
+    eq_(3, len(d))
+    eq_(1, d['Received'])
+    eq_(1, d.get('Received'))
+    eq_([1, 3], d.getall('Received'))
+    eq_(None, d.get('To'))
+    eq_('x', d.get('To', 'x'))
+    eq_([], d.getall('To'))
+    assert_raises(KeyError, lambda: d['To'])
+    ok_('Subject' in d)
+    assert_false('subject' in d)
+    eq_(['Received', 'Subject', 'Received'], d.keys())
+    eq_(['Received', 'Subject', 'Received'], list(d))
+    eq_("MultiDict([('Received', 1), ('Subject', 2), ('Received', 3)])",
+        repr(d))
+
+
+def multidict_prepend_test():
+    d = MultiDict([('Received', 1), ('Subject', 2)])
+    d.prepend('Received', 0)
+    d.append('Received', 3)
+    eq_([('Received', 0), ('Received', 1), ('Subject', 2), ('Received', 3)],
+        d.items())
+    eq_(0, d['Received'])
+    eq_([0, 1, 3], d.getall('Received'))
+
+
+def multidict_set_test():
+    d = MultiDict([('Received', 1), ('Subject', 2), ('Received', 3)])
+    # all values are replaced with a value at the end
+    d['Received'] = 4
+    eq_([('Subject', 2), ('Received', 4)], list(d.iteritems()))
+    d['To'] = 5
+    eq_([('Subject', 2), ('Received', 4), ('To', 5)], d.items())
+
+    del d['Received']
+    eq_([('Subject', 2), ('To', 5)], d.items())
+    assert_false('Received' in d)
+    eq_([], d.getall('Received'))
+    with assert_raises(KeyError):
+        del d['Received']
@@ -1,3 +1,5 @@
+import six
+from mock import patch
 from nose.tools import *
 
 from flanker.mime.message.headers import parsing
@@ -5,3 +7,50 @@ from flanker.mime.message.headers import parsing
 def test_content_type_star():
     _, ctype = parsing.parse_header('Content-Type: image/* ; name="Stuart *Wells.PNG"')
     eq_(ctype.value, 'image/*')
+
+
+def test_normalize():
+    eq_('Content-Type', parsing.normalize('content-TYPE'))
+    eq_('Mime-Version', parsing.normalize('MIME-version'))
+    ok_(parsing.normalize('x-spam-SCORE') is parsing.normalize('X-Spam-Score'))
+    eq_(u'Subject', parsing.normalize(u'sUBJECT'))
+    ok_(isinstance(parsing.normalize(u'Subject'), type(u'')))
+
+
+def test_normalize_cache_is_bounded():
+    with patch.object(parsing, '_MAX_NORMALIZED', 10):
+        for i in range(100):
+            eq_('X-Header-%d' % i, parsing.normalize('x-header-%d' % i))
+            ok_(len(parsing._normalized) <= 10)
+
+
+def test_parse_stream_unfolds_headers():
+    stream = six.BytesIO(
+        b'\tstray continuation\r\n'
+        b'From someone@example.com Mon Jan  1 00:00:00 2018\r\n'
+        b'Received: from a\r\n'
+        b'\tby b\r\n'
+        b' for c\r\n'
+        b'Subject: hello\r\n'
+        b'not a header\r\n'
+        b'body\r\n')
+    eq_([('Received', 'from a\tby b for c'), ('Subject', 'hello')],
+        list(parsing.parse_stream(stream)))
+    eq_(b'not a header\r\n', stream.readline())
+
+
+def test_content_type_cache():
+    raw = 'multipart/mixed; boundary="cached"'
+    first = parsing.parse_header_value('Content-Type', raw)
+    first.params['boundary'] = 'changed'
+    second = parsing.parse_header_value('Content-Type', raw)
+    ok_(first is not second)
+    eq_('multipart/mixed', second.value)
+    eq_({'boundary': 'cached'}, second.params)
+
+    with patch.object(parsing, '_MAX_CONTENT_TYPES', 10):
+        for i in range(100):
+            ctype = parsing.parse_header_value(
+                'Content-Type', 'text/plain; charset="x-%d"' % i)
+            eq_('x-%d' % i, ctype.get_charset())
+            ok_(len(parsing._content_types) <= 10)
@@ -1,4 +1,4 @@
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 
 from flanker.mime.message.headers.wrappers import ContentType
 
@@ -8,3 +8,36 @@ def charset_test():
 
     c = ContentType('application', 'pdf')
     eq_(None, c.get_charset())
+
+
+def content_type_predicates_test():
+    c = ContentType('text', 'plain')
+    ok_(c.is_singlepart())
+    ok_(not c.is_multipart())
+    eq_(('text', 'plain'), (c.format_type, c.subtype))
+
+    c = ContentType('multipart', 'report')
+    ok_(c.is_multipart())
+    ok_(c.is_delivery_report())
+    ok_(not c.is_singlepart())
+
+    c = ContentType('message', 'feedback-report')
+    ok_(c.is_headers_container())
+    ok_(c.is_feedback_report())
+    ok_(not c.is_singlepart())
+    ok_(not c.is_message_container())
+
+    c = ContentType('message', 'rfc822')
+    ok_(c.is_message_container())
+    ok_(not c.is_singlepart())
+    ok_(not c.is_headers_container())
+
+    # predicates follow the type as given, like str() does
+    ok_(ContentType('Multipart', 'Mixed').is_singlepart())
+
+
+def content_type_shared_values_test():
+    a = ContentType('TEXT', 'Plain', {'charset': 'ascii'})
+    b = ContentType('text', 'plain')
+    ok_(a.value is b.value)
+    ok_(a.params is not b.params)
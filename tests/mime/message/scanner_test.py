@@ -1,12 +1,20 @@
 # coding:utf-8
+import six
 from nose.tools import *
 from mock import *
-from flanker.mime.message.scanner import scan, ContentType, Boundary
-from flanker.mime.message.errors import DecodingError
-from email import message_from_string
+from flanker.mime.message.scanner import (scan, tokenize, ContentType,
+                                          Boundary, FeedParser, PartHeaders)
+from flanker.mime.message.errors import DecodingError, LimitExceeded
+from flanker.mime.message.limits import ParseLimits
+from flanker.mime.message import scanner
+import email
 
 from ... import *
 
+# the python parser takes the raw message bytes
+_message_from_bytes = getattr(email, 'message_from_bytes',
+                              email.message_from_string)
+
 C = ContentType
 B = Boundary
 
@@ -15,29 +23,30 @@ def no_ctype_headers_and_and_boundaries_test():
     """We are ok, when there is no content type and boundaries"""
     message = scan(NO_CTYPE)
     eq_(C('text', 'plain', dict(charset='ascii')), message.content_type)
-    pmessage = message_from_string(NO_CTYPE)
-    eq_(message.body, pmessage.get_payload(decode=True))
+    pmessage = _message_from_bytes(NO_CTYPE)
+    eq_(message.body,
+        six.text_type(pmessage.get_payload(decode=True), 'utf-8'))
     for a, b in zip(NO_CTYPE_HEADERS, message.headers.iteritems()):
         eq_(a, b)
 
 
 def multipart_message_test():
     message = scan(EIGHT_BIT)
-    pmessage = message_from_string(EIGHT_BIT)
+    pmessage = _message_from_bytes(EIGHT_BIT)
 
     eq_(C('multipart', 'alternative', dict(boundary='=-omjqkVTVbwdgCWFRgIkx')),
         message.content_type)
 
-    p = unicode(pmessage.get_payload()[0].get_payload(decode=True), 'utf-8')
+    p = six.text_type(pmessage.get_payload()[0].get_payload(decode=True), 'utf-8')
     eq_(p, message.parts[0].body)
 
-    p = pmessage.get_payload()[1].get_payload(decode=True)
+    p = six.text_type(pmessage.get_payload()[1].get_payload(decode=True), 'utf-8')
     eq_(p, message.parts[1].body)
 
 
 def enclosed_message_test():
     message = scan(ENCLOSED)
-    pmessage = message_from_string(ENCLOSED)
+    pmessage = _message_from_bytes(ENCLOSED)
 
     eq_(C('multipart', 'mixed',
           dict(boundary='===============6195527458677812340==')),
@@ -54,13 +63,13 @@ def enclosed_message_test():
         enclosed.headers['Content-Type'])
 
     pbody = penclosed.get_payload()[0].get_payload()[0].get_payload(decode=True)
-    pbody = unicode(pbody, 'utf-8')
+    pbody = six.text_type(pbody, 'utf-8')
     body = enclosed.enclosed.parts[0].body
     eq_(pbody, body)
 
     body = enclosed.enclosed.parts[1].body
     pbody = penclosed.get_payload()[0].get_payload()[1].get_payload(decode=True)
-    pbody = unicode(pbody, 'utf-8')
+    pbody = six.text_type(pbody, 'utf-8')
     eq_(pbody, body)
 
 
@@ -115,7 +124,6 @@ def test_uservoice_case():
     message._container._body_changed = True
     val = message.to_string()
     for line in val.splitlines():
-        print line
         ok_(len(line) < 200)
     message = scan(val)
     eq_(html, message.body)
@@ -236,6 +244,154 @@ def missing_newline_test():
     eq_("hello, world", message.body)
 
 
+def non_utf8_8bit_body_test():
+    mime = (b"Content-Type: text/plain; charset=iso-8859-1\r\n"
+            b"Content-Transfer-Encoding: 8bit\r\n\r\n"
+            b"caf\xe9\r\n")
+    message = scan(mime)
+    eq_(u'caf\xe9\r\n', message.body)
+
+
+def raw_buffer_is_not_copied_test():
+    message = scan(ENCLOSED)
+    ok_(message._container.string is ENCLOSED)
+    ok_(message.parts[1].enclosed._container.string is ENCLOSED)
+
+
+def lazy_parts_test():
+    message = scan(ENCLOSED)
+    ok_(message._loader is not None)
+    eq_(2, len(message.parts))
+    ok_(message._loader is None)
+
+    enclosed = message.parts[1]
+    ok_(enclosed._loader is not None)
+    eq_(u'Thanks!', enclosed.enclosed.subject)
+    ok_(enclosed.enclosed._loader is not None)
+    eq_(2, len(enclosed.enclosed.parts))
+
+
+def limits_test():
+    for limits, limit in ((ParseLimits(max_parts=3), 'max_parts'),
+                          (ParseLimits(max_depth=2), 'max_depth'),
+                          (ParseLimits(max_header_bytes=1000),
+                           'max_header_bytes')):
+        with assert_raises(LimitExceeded) as e:
+            scan(ENCLOSED, limits)
+        eq_(limit, e.exception.limit)
+
+    message = scan(ENCLOSED, ParseLimits(max_parts=20, max_depth=3,
+                                         max_header_bytes=3000))
+    eq_(2, len(message.parts[1].enclosed.parts))
+
+    many_parts = (b'Content-Type: multipart/mixed; boundary=b\r\n\r\n' +
+                  b'--b\r\nContent-Type: text/plain\r\n\r\nhi\r\n' * 600 +
+                  b'--b--\r\n')
+    with assert_raises(LimitExceeded) as e:
+        scan(many_parts)
+    eq_('Too many parts: 501, max is 500', str(e.exception))
+    message = scan(many_parts, ParseLimits(max_parts=2000))
+    eq_(600, len(message.parts))
+
+    # headers of a child part that run to the end of the message are only
+    # read when the part is loaded
+    headers = b''.join(b'X-Header-%d: value\r\n' % i for i in range(2000))
+    message = scan(b'Content-Type: multipart/mixed; boundary=b\r\n\r\n'
+                   b'--b\r\n' + headers, ParseLimits(max_header_bytes=10000))
+    with assert_raises(LimitExceeded) as e:
+        message.parts[0].headers
+    eq_('max_header_bytes', e.exception.limit)
+
+
+@patch('flanker.mime.message.limits._now')
+def limits_timeout_test(now):
+    clock = [0]
+    now.side_effect = lambda: clock[0]
+    message = scan(ENCLOSED, ParseLimits(timeout=0.5))
+
+    # lazy header loads do not count against the timeout of the scan
+    clock[0] = 10
+    eq_('message/rfc822', message.parts[1].headers['Content-Type'])
+
+    def tick():
+        clock[0] += 1
+        return clock[0]
+    now.side_effect = tick
+    with assert_raises(LimitExceeded) as e:
+        scan(ENCLOSED, ParseLimits(timeout=0.5))
+    eq_('timeout', e.exception.limit)
+    eq_(1, e.exception.value)
+
+
+@patch('flanker.mime.message.limits._now')
+def limits_timeout_feed_parser_test(now):
+    clock = [0]
+    now.side_effect = lambda: clock[0]
+    # waiting for the next chunk does not count against the timeout
+    parser = FeedParser(ParseLimits(timeout=0.5))
+    for i in range(0, len(ENCLOSED), 1000):
+        clock[0] += 0.7
+        parser.feed(ENCLOSED[i:i + 1000])
+    clock[0] += 0.7
+    eq_(2, len(parser.close().parts))
+
+    # the time spent in feed() calls adds up
+    def tick():
+        clock[0] += 0.1
+        return clock[0]
+    now.side_effect = tick
+    parser = FeedParser(ParseLimits(timeout=0.5))
+    with assert_raises(LimitExceeded) as e:
+        for i in range(0, len(ENCLOSED), 100):
+            clock[0] += 10
+            parser.feed(ENCLOSED[i:i + 100])
+    eq_('timeout', e.exception.limit)
+
+
+def limits_headers_test():
+    limits = ParseLimits(max_header_bytes=1000)
+    assert_raises(LimitExceeded, scanner.scan_headers, ENCLOSED, limits)
+    parser = FeedParser(limits)
+    assert_raises(LimitExceeded, parser.feed, ENCLOSED)
+
+
+def feed_parser_test():
+    for message in (ENCLOSED, NDN, NO_CTYPE, BOUNCE, DASHED_BOUNDARIES,
+                    MISSING_FINAL_BOUNDARY):
+        expected = tokenize(message)
+        for size in (1, 7, 1000):
+            parser = FeedParser()
+            boundaries = []
+            for i in range(0, len(message), size):
+                boundaries.extend(e for e in parser.feed(message[i:i + size])
+                                  if isinstance(e, Boundary))
+            msg = parser.close()
+            eq_(expected, parser._tokens)
+            eq_([t for t in expected if isinstance(t, Boundary)], boundaries)
+            eq_(tree_to_string(scan(message)), tree_to_string(msg))
+            eq_(scan(message).to_string(), msg.to_string())
+
+
+def feed_parser_headers_test():
+    parser = FeedParser()
+    # Everything up to the headers of the enclosed message.
+    events = parser.feed(ENCLOSED[:ENCLOSED.index(b'Received: by 127.0.1.1')])
+    eq_([PartHeaders, Boundary, PartHeaders, Boundary, PartHeaders],
+        [type(e) for e in events])
+    eq_('multipart/mixed', events[0].headers['Content-Type'])
+    eq_('<4FEEF9B3.7060508@example.net>', events[0].headers['Message-Id'])
+    eq_('text/plain', events[2].headers['Content-Type'])
+    eq_('message/rfc822', events[4].headers['Content-Type'])
+
+    # The enclosed message headers are complete once the empty line arrives.
+    events = parser.feed(ENCLOSED[events[4].end:ENCLOSED.index(b'\n--', events[4].end)])
+    eq_([], events)
+    events = parser.feed(b'\n')
+    eq_([PartHeaders], [type(e) for e in events])
+    eq_('multipart/alternative', events[0].headers['Content-Type'])
+    eq_('Thanks!', events[0].headers['Subject'])
+
+
 def tree_to_string(part):
     parts = []
     print_tree(part, parts, "")
@@ -197,6 +197,26 @@ def tokenizer_table_driven_test():
             B('_001_538f5bb0a7956_457a8046c758764ef_', 685, 725, final=False),
             C('application', 'pdf', {'name': 'test.pdf'}),
             B('_001_538f5bb0a7956_457a8046c758764ef_', 10239, 10281, final=True)]
+    }, {
+        'desc': 'False boundaries and content types in bodies are skipped',
+        'mime': (b'Content-Type: multipart/mixed; boundary="bd"\r\n\r\n'
+                 b'--bd\r\n'
+                 b'Content-Type: text/plain\r\n\r\n'
+                 b'Content-Type: text/html\r\n'
+                 b'--bdx\r\n'
+                 b'---bd\r\n'
+                 b'x--bd\r\n'
+                 b'--bd \t\r\n'
+                 b'--bd\t\r\n'
+                 b'Content-Type: text/html\r\n\r\n'
+                 b'--bd--\r\n'),
+        'tokens': [
+            C('multipart', 'mixed', {'boundary': 'bd'}),
+            B('bd', 46, 53, final=False),
+            C('text', 'plain', {}),
+            B('bd', 134, 142, final=False),
+            C('text', 'html', {}),
+            B('bd', 168, 177, final=True)]
     }]):
         print('Test case #%d: %s' % (i, tc['desc']))
 
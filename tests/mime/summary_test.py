@@ -0,0 +1,78 @@
+# coding:utf-8
+from mock import patch
+from nose.tools import eq_, ok_, assert_raises
+
+from flanker import mime
+from flanker.mime.summary import summarize_message
+from tests import ENCLOSED, ATTACHED_PDF
+
+
+def summarize_test():
+    summary = mime.summarize(ENCLOSED)
+    eq_(sorted(mime.summary.FIELDS), sorted(summary))
+    eq_('4FEEF9B3.7060508@example.net', summary['message_id'])
+    eq_([(u'Bob Marley', u'bob@example.net')], summary['from'])
+    eq_([(u'Александр Клижентас☯', u'bob@example.com')], summary['to'])
+    eq_([], summary['cc'])
+    eq_(u'Wow', summary['subject'])
+    eq_(1341061555, summary['date'])
+    eq_(u'Hello\r\n', summary['text'])
+    eq_(None, summary['html'])
+    eq_([(u'thanks.eml', 'message/rfc822', 2504)], summary['attachments'])
+
+
+def summarize_attachments_test():
+    summary = mime.summarize(ATTACHED_PDF, fields=('text', 'attachments'))
+    eq_(['attachments', 'text'], sorted(summary))
+    eq_(u'Test - body content\n\n', summary['text'])
+    eq_([(u'test.pdf', 'application/pdf', 6940)], summary['attachments'])
+
+
+def summarize_attachment_size_test():
+    # the size of the decoded body, not of the raw part
+    message = mime.from_string(ATTACHED_PDF)
+    attachment = list(message.walk())[-1]
+    summary = summarize_message(message, ('attachments',))
+    eq_(len(attachment.body), summary['attachments'][0][2])
+    ok_(attachment.size > len(attachment.body))
+
+
+def summarize_unknown_fields_test():
+    with assert_raises(ValueError):
+        mime.summarize(ENCLOSED, fields=('subject', 'body'))
+    with assert_raises(ValueError):
+        summarize_message(mime.from_string(ENCLOSED), ('text', 'sender'))
+
+
+def empty_summary_test():
+    eq_({'from': [], 'subject': u'', 'date': None, 'headers': {}},
+        mime.summary.empty_summary(('from', 'subject', 'date', 'headers')))
+    eq_(sorted(mime.summary.FIELDS), sorted(mime.summary.empty_summary()))
+    with assert_raises(ValueError):
+        mime.summary.empty_summary(('body',))
+
+
+def summarize_headers_only_test():
+    with patch('flanker.mime.message.scanner.scan') as scan:
+        summary = mime.summarize(ENCLOSED, fields=('message_id', 'subject'))
+        eq_(0, scan.call_count)
+    eq_({'message_id': '4FEEF9B3.7060508@example.net', 'subject': u'Wow'},
+        summary)
+
+
+def summarize_message_test():
+    message = mime.from_string(ENCLOSED)
+    summary = summarize_message(message, ('headers',))
+    eq_(u'Wow', summary['headers']['Subject'])
+    eq_(('multipart/mixed', {'boundary': '===============6195527458677812340=='}),
+        summary['headers']['Content-Type'])
+
+
+def summarize_stops_early_test():
+    message = mime.from_string(ATTACHED_PDF)
+    summary = summarize_message(message, ('text',))
+    eq_({'text': u'Test - body content\n\n'}, summary)
+    # the attachment after the text body is not looked into
+    attachment = list(message.walk())[-1]
+    eq_('application/pdf', attachment.content_type)
+    eq_(None, attachment._container._headers)